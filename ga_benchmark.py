@@ -0,0 +1,377 @@
+'''Benchmark of the operators of the four problems. Every fitness, selection, crossover and mutation function is timed
+separately, on populations generated from a fixed seed, for several problem sizes and population sizes. The results
+are written as JSON and can be compared with a previous run, to catch regressions:
+
+  python ga_benchmark.py --scales small medium --output baseline.json
+  python ga_benchmark.py --scales small medium --output results.json --baseline baseline.json
+'''
+import argparse
+import copy
+import json
+import platform
+import sys
+import timeit
+
+import numpy as np
+
+import ga_compounds as cp
+import ga_keyword as kw
+import ga_travelling_salesman as ts
+import ga_vehicle_routing as vr
+
+PROBLEMS = ['ts', 'vr', 'kw', 'cp']
+
+# (problem size, population size) pairs. The problem size is the number of cities for ts and vr, the keyword length
+# for kw and the number of elements for cp.
+SCALES = {
+    'ts': {'small': [(10, 1000), (100, 1000)],
+           'medium': [(100, 10000), (1000, 1000)],
+           'large': [(10, 100000), (1000, 10000), (10000, 1000)]},
+    'vr': {'small': [(10, 1000), (100, 1000)],
+           'medium': [(100, 10000), (1000, 1000)],
+           'large': [(10, 100000), (1000, 10000), (10000, 1000)]},
+    'kw': {'small': [(10, 1000), (100, 1000)],
+           'medium': [(10, 10000), (1000, 1000)],
+           'large': [(10, 100000), (1000, 10000)]},
+    'cp': {'small': [(3, 1000), (5, 1000)],
+           'medium': [(5, 10000), (10, 10000)],
+           'large': [(5, 100000), (10, 100000)]},
+}
+
+PENALTY = 1000
+CROSSOVER_RATE = 0.5
+MUTATION_RATE = 0.05
+
+def _matrix_dtype(number_cities):
+    '''float32 distance matrices above a few thousand cities, where a float64 one takes hundreds of megabytes.'''
+    return np.float32 if number_cities > 2000 else np.float64
+
+def problem_ts(size, population_size, array, rng):
+    '''Random travelling salesman instance and the operators to time.
+
+    Args:
+      size: number of cities.
+
+      population_size: number of individuals.
+
+      array: True for an array population.
+
+      rng: numpy random generator.
+
+    Returns:
+      population: initial population.
+
+      operators: list of (stage, name, function (population, fitness) -> result).
+    '''
+    cities = ts.cities_ts(size, 10 * size, rng)
+    distances = ts.distance_matrix_ts(cities, _matrix_dtype(size))
+    population = ts.population_ts(population_size, size, array, rng)
+
+    operators = [
+        ('fitness', 'population_fitness_ts', lambda p, f: ts.population_fitness_ts(p, cities, PENALTY, distances)),
+        ('selection', 'roulette_selection_ts', lambda p, f: ts.roulette_selection_ts(p, f, rng=rng)),
+        ('selection', 'roulette_selection_ts[sus]', lambda p, f: ts.roulette_selection_ts(p, f, 'sus', rng)),
+        ('crossover', 'population_ordered_crossover_ts',
+         lambda p, f: ts.population_ordered_crossover_ts(p, CROSSOVER_RATE, rng)),
+        ('mutation', 'population_switch_mutation_ts',
+         lambda p, f: ts.population_switch_mutation_ts(p, MUTATION_RATE, rng)),
+    ]
+    return population, operators
+
+def problem_vr(size, population_size, array, rng):
+    '''Random vehicle routing instance and the operators to time, with one vehicle for every 20 cities.
+
+    Args:
+      size: number of cities.
+
+      population_size: number of individuals.
+
+      array: True for a flattened population.
+
+      rng: numpy random generator.
+
+    Returns:
+      population: initial population.
+
+      operators: list of (stage, name, function (population, fitness) -> result).
+    '''
+    number_vehicles = max(2, size // 20)
+    cities = vr.cities_vr(size, 10 * size, rng)
+    distances = vr.distance_matrix_vr(cities, _matrix_dtype(size))
+    population = vr.population_vr(population_size, size, number_vehicles, array, rng)
+
+    operators = [
+        ('fitness', 'population_fitness_vr', lambda p, f: vr.population_fitness_vr(p, cities, distances)),
+        ('selection', 'roulette_selection_vr', lambda p, f: vr.roulette_selection_vr(p, f, rng=rng)),
+        ('selection', 'tournament_selection_vr', lambda p, f: vr.tournament_selection_vr(p, f, rng=rng)),
+        ('crossover', 'population_ordered_crossover_vr',
+         lambda p, f: vr.population_ordered_crossover_vr(p, CROSSOVER_RATE, rng)),
+        ('mutation', 'population_switch_mutation_vr',
+         lambda p, f: vr.population_switch_mutation_vr(p, MUTATION_RATE, rng=rng)),
+        ('mutation', 'population_partition_mutation_vr',
+         lambda p, f: vr.population_partition_mutation_vr(p, MUTATION_RATE, rng)),
+        ('mutation', 'population_inter_route_mutation_vr',
+         lambda p, f: vr.population_inter_route_mutation_vr(p, f, distances, mutation_rate=MUTATION_RATE, rng=rng)),
+    ]
+    return population, operators
+
+def problem_kw(size, population_size, array, rng):
+    '''Random keyword and the operators to time. The individuals have between half and twice the keyword length.
+
+    Args:
+      size: length of the keyword.
+
+      population_size: number of individuals.
+
+      array: True for an array population.
+
+      rng: numpy random generator.
+
+    Returns:
+      population: initial population.
+
+      operators: list of (stage, name, function (population, fitness) -> result).
+    '''
+    keyword = ''.join(kw.gene_kw(rng) for _ in range(size))
+    individual_size = [max(1, size // 2), 2 * size]
+    population = kw.population_kw(population_size, individual_size, array, rng)
+
+    operators = [
+        ('fitness', 'population_fitness_kw', lambda p, f: kw.population_fitness_kw(p, keyword)),
+        ('selection', 'roulette_selection_kw', lambda p, f: kw.roulette_selection_kw(p, f, rng=rng)),
+        ('crossover', 'population_size_adaptative_crossover_kw',
+         lambda p, f: kw.population_size_adaptative_crossover_kw(p, CROSSOVER_RATE, rng)),
+        ('mutation', 'population_gene_mutation_kw', lambda p, f: kw.population_gene_mutation_kw(p, MUTATION_RATE, rng)),
+        ('mutation', 'population_size_mutation_kw',
+         lambda p, f: kw.population_size_mutation_kw(p, individual_size, MUTATION_RATE, rng)),
+    ]
+    return population, operators
+
+def problem_cp(size, population_size, array, rng):
+    '''Random compounds and the operators to time.
+
+    Args:
+      size: number of elements in each compound.
+
+      population_size: number of individuals.
+
+      array: True for an array population.
+
+      rng: numpy random generator.
+
+    Returns:
+      population: initial population.
+
+      operators: list of (stage, name, function (population, fitness) -> result).
+    '''
+    population = cp.population_cp(population_size, size, array, rng)
+
+    operators = [
+        ('fitness', 'population_fitness_cp', lambda p, f: cp.population_fitness_cp(p)),
+        ('selection', 'roulette_selection_cp', lambda p, f: cp.roulette_selection_cp(p, f, rng=rng)),
+        ('selection', 'tournament_selection_cp', lambda p, f: cp.tournament_selection_cp(p, f, rng=rng)),
+        ('crossover', 'population_pair_crossover_cp',
+         lambda p, f: cp.population_pair_crossover_cp(p, CROSSOVER_RATE, rng)),
+        ('mutation', 'population_element_mutation_cp',
+         lambda p, f: cp.population_element_mutation_cp(p, MUTATION_RATE, rng=rng)),
+        ('mutation', 'population_weight_mutation_cp',
+         lambda p, f: cp.population_weight_mutation_cp(p, MUTATION_RATE, rng)),
+    ]
+    return population, operators
+
+PROBLEM_FUNCTIONS = {'ts': problem_ts, 'vr': problem_vr, 'kw': problem_kw, 'cp': problem_cp}
+
+def _copy_population(population):
+    '''Independent copy of a population, so operators working in place always start from the same individuals.'''
+    if isinstance(population, tuple):
+        return tuple(array.copy() for array in population)
+
+    if isinstance(population, np.ndarray):
+        return population.copy()
+
+    return copy.deepcopy(population)
+
+def time_operator(function, population, fitness, repeat=3):
+    '''Times an operator on copies of a population. The copies are made outside of the timed section.
+
+    Args:
+      function: function (population, fitness) -> result.
+
+      population: population given to the operator.
+
+      fitness: fitness values of the population.
+
+      repeat: number of timed calls.
+
+    Returns:
+      times: list with the duration of each call, in seconds.
+    '''
+    times = []
+
+    for _ in range(repeat):
+        argument = _copy_population(population)
+        start = timeit.default_timer()
+        function(argument, fitness)
+        times.append(timeit.default_timer() - start)
+
+    return times
+
+def run_case(problem, size, population_size, array, seed=0, repeat=3):
+    '''Times all the operators of one problem at one scale. The instance only depends on the seed and on the case, so
+    it is the same whatever other cases are run.
+
+    Args:
+      problem: 'ts', 'vr', 'kw' or 'cp'.
+
+      size: problem size, see SCALES.
+
+      population_size: number of individuals.
+
+      array: True for array populations.
+
+      seed: integer seed of the benchmark.
+
+      repeat: number of timed calls of each operator.
+
+    Returns:
+      results: list of dictionaries, one for each operator.
+    '''
+    entropy = [seed, PROBLEMS.index(problem), size, population_size, int(array)]
+    rng = np.random.default_rng(np.random.SeedSequence(entropy))
+    population, operators = PROBLEM_FUNCTIONS[problem](size, population_size, array, rng)
+    fitness = operators[0][2](population, None)
+
+    results = []
+    for stage, name, function in operators:
+        times = time_operator(function, population, fitness, repeat)
+        results.append({'problem': problem, 'format': 'array' if array else 'list', 'size': size,
+                        'population_size': population_size, 'stage': stage, 'operator': name,
+                        'best': min(times), 'mean': sum(times) / len(times), 'repeat': repeat})
+
+    return results
+
+def run_benchmark(problems=PROBLEMS, scales=('small',), formats=('list', 'array'), cases=None, seed=0, repeat=3,
+                  verbose=False):
+    '''Runs the benchmark.
+
+    Args:
+      problems: problems to benchmark.
+
+      scales: names of the scales of SCALES to run.
+
+      formats: 'list' and/or 'array' populations.
+
+      cases: list of (size, population_size) pairs, used for every problem instead of the scales.
+
+      seed: integer seed of the benchmark.
+
+      repeat: number of timed calls of each operator.
+
+      verbose: if True, prints each result as it is measured.
+
+    Returns:
+      report: dictionary with the machine description in 'meta' and the measurements in 'results'.
+    '''
+    results = []
+
+    for problem in problems:
+        problem_cases = cases or [case for scale in scales for case in SCALES[problem][scale]]
+        for size, population_size in problem_cases:
+            for population_format in formats:
+                for result in run_case(problem, size, population_size, population_format == 'array', seed, repeat):
+                    if verbose:
+                        print(_format_result(result))
+                    results.append(result)
+
+    meta = {'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(),
+            'platform': platform.platform(), 'seed': seed, 'repeat': repeat}
+    return {'meta': meta, 'results': results}
+
+def _case_key(result):
+    return (result['problem'], result['format'], result['size'], result['population_size'], result['operator'])
+
+def _format_result(result):
+    return (f"{result['problem']:>3} {result['format']:>5} size={result['size']:<6} "
+            f"population={result['population_size']:<7} {result['operator']:<42} {result['best'] * 1000:10.3f} ms")
+
+def compare(report, baseline, tolerance=0.25):
+    '''Compares the best times of a report with the ones of a baseline report.
+
+    Args:
+      report: report from run_benchmark.
+
+      baseline: earlier report.
+
+      tolerance: relative slowdown accepted before a case counts as a regression, 0.25 meaning 25%.
+
+    Returns:
+      comparison: list of dictionaries with the case, the baseline and current times, their ratio and a status,
+      'regression', 'improvement', 'unchanged' or 'new'.
+    '''
+    baseline_times = {_case_key(result): result['best'] for result in baseline['results']}
+    comparison = []
+
+    for result in report['results']:
+        entry = dict(result)
+        previous = baseline_times.get(_case_key(result))
+        entry['baseline'] = previous
+
+        if previous is None:
+            entry['ratio'] = None
+            entry['status'] = 'new'
+        else:
+            entry['ratio'] = result['best'] / previous if previous > 0 else float('inf')
+            if entry['ratio'] > 1 + tolerance:
+                entry['status'] = 'regression'
+            elif entry['ratio'] < 1 / (1 + tolerance):
+                entry['status'] = 'improvement'
+            else:
+                entry['status'] = 'unchanged'
+
+        comparison.append(entry)
+
+    return comparison
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Times the operators of the genetic algorithm problems.')
+    parser.add_argument('--problems', nargs='+', choices=PROBLEMS, default=PROBLEMS)
+    parser.add_argument('--scales', nargs='+', choices=['small', 'medium', 'large'], default=['small'])
+    parser.add_argument('--formats', nargs='+', choices=['list', 'array'], default=['list', 'array'])
+    parser.add_argument('--sizes', nargs='+', type=int,
+                        help='problem sizes, combined with --populations instead of the scales')
+    parser.add_argument('--populations', nargs='+', type=int, default=[1000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='JSON file receiving the results')
+    parser.add_argument('--baseline', help='JSON file of an earlier run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='relative slowdown counted as a regression (default: 0.25)')
+    args = parser.parse_args(argv)
+
+    cases = [(size, population_size) for size in args.sizes for population_size in args.populations] \
+        if args.sizes else None
+    report = run_benchmark(args.problems, args.scales, args.formats, cases, args.seed, args.repeat, verbose=True)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+        comparison = compare(report, baseline, args.tolerance)
+        print()
+        for entry in comparison:
+            ratio = f"{entry['ratio']:6.2f}x" if entry['ratio'] is not None else '      -'
+            print(f'{_format_result(entry)} {ratio} {entry["status"]}')
+
+        regressions = [entry for entry in comparison if entry['status'] == 'regression']
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) above {args.tolerance:.0%}')
+            return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
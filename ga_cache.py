@@ -0,0 +1,69 @@
+from collections import OrderedDict
+
+class FitnessCache:
+    '''Bounded memory of fitness values, keyed on the content of the individuals. Selection samples with replacement, so
+    converged populations are full of copies of the same solutions, and their fitness only needs to be computed once.
+    When the cache is full, the least recently used entry is evicted.
+
+    A cache stores fitness values for one problem only: it must not be shared between runs with different cities,
+    keywords or penalties.
+
+    Args:
+      maxsize: maximum number of fitness values kept.
+    '''
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def get(self, key):
+        '''Returns the fitness stored for a key, or None if it is not in the cache.
+
+        Args:
+          key: hashable representation of an individual, as given by the individual_key_* functions.
+
+        Returns:
+          fitness: stored value, or None.
+        '''
+        fitness = self._values.get(key)
+
+        if fitness is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._values.move_to_end(key)
+
+        return fitness
+
+    def put(self, key, fitness):
+        '''Stores the fitness of a key, evicting the least recently used entry if the cache is full.
+
+        Args:
+          key: hashable representation of an individual.
+
+          fitness: fitness value of the individual.
+        '''
+        self._values[key] = fitness
+        self._values.move_to_end(key)
+
+        if len(self._values) > self.maxsize:
+            self._values.popitem(last=False)
+
+    def clear(self):
+        '''Removes every entry and resets the counters.'''
+        self._values.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        '''Fraction of lookups answered by the cache.'''
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
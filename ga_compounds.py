@@ -1,4 +1,7 @@
-import random as rd
+import numpy as np
+
+from ga_random import get_rng
+from ga_selection import selection_indices, take_individuals, tournament_indices
 
 PRICE = {
     "H": 1.39, "He": 24, "Li": 85.6, "Be": 857, "B": 3.68, "C": 0.122,
@@ -41,21 +44,35 @@ ATOMIC_WEIGHT = {
 
 ELEMENTS = list(PRICE.keys())
 
-def individual_cp(num_elements):
+# Tables aligned with ELEMENTS, so an element can be represented by its index
+ELEMENT_INDEX = {element: i for i, element in enumerate(ELEMENTS)}
+PRICE_TABLE = np.array([PRICE[element] for element in ELEMENTS])
+ATOMIC_WEIGHT_TABLE = np.array([ATOMIC_WEIGHT[element] for element in ELEMENTS])
+
+MAXIMUM_WEIGHT = 90 * ATOMIC_WEIGHT['Cf'] + 5 * ATOMIC_WEIGHT['Bk'] + 5 * ATOMIC_WEIGHT['Cm']
+MAXIMUM_PRICE = 90 * PRICE['Po'] + 5 * PRICE['Ac'] + 5 * PRICE['Bk']
+
+# Contribution of one unit of weight of each element to the fitness
+FITNESS_TABLE = - ATOMIC_WEIGHT_TABLE / MAXIMUM_WEIGHT + PRICE_TABLE / MAXIMUM_PRICE
+
+def individual_cp(num_elements, rng=None):
     '''Creates a list containing a list with the elements and another one with the weights.
     
     Args:
       num_elements: number of elements in the compound.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       individual: list representing the compound.
       '''    
-    elements = rd.sample(ELEMENTS, num_elements)
+    rng = get_rng(rng)
+    elements = [ELEMENTS[i] for i in rng.permutation(len(ELEMENTS))[: num_elements]]
     weights = []
-    weights.append(rd.uniform(5, 90))
+    weights.append(rng.uniform(5, 90))
     
     for _ in range(num_elements - 2):
-        weight = rd.uniform(5, 95 - sum(weights))
+        weight = 5 + (90 - sum(weights)) * rng.random()
         weights.append(weight)
         
     weights.append(100 - sum(weights))
@@ -64,7 +81,7 @@ def individual_cp(num_elements):
     
     return individual
 
-def population_cp(population_size, num_elements):
+def population_cp(population_size, num_elements, array=False, rng=None):
     '''Creates a population of compounds.
     
     Args:
@@ -72,16 +89,64 @@ def population_cp(population_size, num_elements):
       
       num_elements: number of elements in the compound.
       
+      array: if True, the population is returned as a tuple of arrays, see encode_population_cp.
+      
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
-      population: list of individuals.
+      population: list of individuals, or tuple (elements, weights) of arrays.
     '''
+    rng = get_rng(rng)
+    
+    if array:
+        keys = rng.random((population_size, len(ELEMENTS)))
+        elements = np.argsort(keys, axis=1)[:, : num_elements].astype(np.int16)
+        
+        weights = np.empty((population_size, num_elements))
+        weights[:, 0] = rng.uniform(5, 90, size=population_size)
+        
+        # Same bounds as individual_cp, which may be reversed once the previous weights add up to more than 90
+        for i in range(1, num_elements - 1):
+            weights[:, i] = 5 + (90 - weights[:, : i].sum(axis=1)) * rng.random(population_size)
+            
+        weights[:, -1] = 100 - weights[:, : -1].sum(axis=1)
+        return elements, weights
+    
     population = []
     
     for _ in range(population_size):
-        individual = individual_cp(num_elements)
+        individual = individual_cp(num_elements, rng)
         population.append(individual)
         
     return population
+
+def encode_population_cp(population):
+    '''Converts a list population into arrays: the index of each element in ELEMENTS, and the weights.
+    
+    Args:
+      population: list of individuals, all with the same number of elements.
+      
+    Returns:
+      elements: int16 array of shape (population_size, num_elements).
+      
+      weights: float array of shape (population_size, num_elements).
+    '''
+    elements = np.array([[ELEMENT_INDEX[element] for element in individual[0]] for individual in population], 
+                        dtype=np.int16)
+    weights = np.array([individual[1] for individual in population], dtype=np.float64)
+    return elements, weights
+
+def decode_population_cp(population):
+    '''Converts a population of arrays back into a list of individuals.
+    
+    Args:
+      population: tuple (elements, weights) of arrays.
+      
+    Returns:
+      population: list of individuals.
+    '''
+    elements, weights = population
+    return [[[ELEMENTS[i] for i in row], list(weight)] for row, weight in zip(elements.tolist(), weights.tolist())]
         
 def individual_fitness_cp(individual):
     '''Calculates the weight and price of the compound. It returns price - weight, which needs to be maximized.
@@ -98,27 +163,51 @@ def individual_fitness_cp(individual):
     for i in range(len(elements)):
         weight += ATOMIC_WEIGHT[elements[i]] * weights[i]
         price += PRICE[elements[i]] * weights[i]
-        
-    maximum_weight = 90 * ATOMIC_WEIGHT['Cf'] + 5 * ATOMIC_WEIGHT['Bk'] + 5 * ATOMIC_WEIGHT['Cm']
-    maximum_price = 90 * PRICE['Po'] + 5 * PRICE['Ac'] + 5 * PRICE['Bk']
     
-    fitness = - (weight / maximum_weight) + (price / maximum_price)
+    fitness = - (weight / MAXIMUM_WEIGHT) + (price / MAXIMUM_PRICE)
     return fitness
             
-def population_fitness_cp(population):
-    '''Calculates the fitness for a population.
+def individual_key_cp(individual):
+    '''Hashable representation of an individual, used as key of a FitnessCache.
     
     Args:
-      population: list of individuals.
-            
+      individual: compound.
+      
+    Returns:
+      key: tuple of (element, weight) pairs.
+    '''
+    return tuple(zip(individual[0], individual[1]))
+        
+def population_fitness_cp(population, cache=None):
+    '''Calculates the fitness for a population. Populations of arrays are scored at once, as the dot product of the 
+    weights with the fitness contribution of each element.
+    
+    Args:
+      population: list of individuals, or tuple (elements, weights) of arrays.
+      
+      cache: optional FitnessCache from ga_cache, only for list populations. Individuals already in it are not 
+      evaluated again.
+      
     Returns:
-      population_fitness: list with all fitness values from the individuals in the population.
+      population_fitness: list with all fitness values from the individuals in the population, or array of them for 
+      populations of arrays.
       
     '''
+    if isinstance(population, tuple):
+        elements, weights = population
+        return np.einsum('ij,ij->i', FITNESS_TABLE[elements], weights)
+    
     population_fitness = []
     
     for individual in population: 
-        fitness = individual_fitness_cp(individual)
+        if cache is None:
+            fitness = individual_fitness_cp(individual)
+        else:
+            key = individual_key_cp(individual)
+            fitness = cache.get(key)
+            if fitness is None:
+                fitness = individual_fitness_cp(individual)
+                cache.put(key, fitness)
         population_fitness.append(fitness)
         
     return population_fitness
@@ -127,7 +216,7 @@ def population_fitness_cp(population):
 ############################## MUTATION OPERATORS ###############################
 #################################################################################
         
-def element_mutation_cp(individual, individual_mutation_rate=0.05, element_mutation_rate=0.25):
+def element_mutation_cp(individual, individual_mutation_rate=0.05, element_mutation_rate=0.25, rng=None):
     '''Mutates one or more element from a individual, with a certain mutation rate.
     
     Args:
@@ -135,39 +224,63 @@ def element_mutation_cp(individual, individual_mutation_rate=0.05, element_mutat
       
       mutation_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       individual: list representing a solution.
     '''
-    value = rd.random()
+    rng = get_rng(rng)
+    value = rng.random()
     num_elements = len(individual[0])
     
     if value < individual_mutation_rate:
         for i in range(num_elements):
-            value = rd.random()
+            value = rng.random()
             
             if value < element_mutation_rate:
-                individual[0][i] = rd.choice(ELEMENTS)
+                individual[0][i] = ELEMENTS[rng.integers(0, len(ELEMENTS))]
         
     return individual
 
-def population_element_mutation_cp(population, individual_mutation_rate=0.05, element_mutation_rate=0.25):
-    '''Applies the element mutation to a whole population:
+def population_element_mutation_cp(population, individual_mutation_rate=0.05, element_mutation_rate=0.25, rng=None, 
+                                   copy=False):
+    '''Applies the element mutation to a whole population. The individuals and elements to mutate, and the new 
+    elements, are drawn for the whole population at once, and only the chosen individuals are touched.
     
     Args:
-      population: list of individuals.
+      population: list of individuals, or tuple (elements, weights) of arrays.
       
       mutation_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
+      copy: for populations of arrays, if True the mutation is applied to copies and the input is left untouched. 
+      Otherwise the arrays are changed in place.
+      
     Returns:
-      population: list of individuals.
+      population: list of individuals, or tuple (elements, weights) of arrays.
     
     '''    
-    for individual in population:
-        mutated_individual = element_mutation_cp(individual, individual_mutation_rate, element_mutation_rate)    
+    rng = get_rng(rng)
+    
+    if isinstance(population, tuple):
+        elements, weights = (array.copy() for array in population) if copy else population
+        mutated = np.flatnonzero(rng.random(len(elements)) < individual_mutation_rate)
+        rows, columns = np.nonzero(rng.random((len(mutated), elements.shape[1])) < element_mutation_rate)
+        elements[mutated[rows], columns] = rng.integers(0, len(ELEMENTS), size=len(rows))
+        return elements, weights
+    
+    num_elements = len(population[0][0]) if population else 0
+    mutated = np.flatnonzero(rng.random(len(population)) < individual_mutation_rate)
+    rows, columns = np.nonzero(rng.random((len(mutated), num_elements)) < element_mutation_rate)
+    new_elements = rng.integers(0, len(ELEMENTS), size=len(rows))
+    
+    for i, column, element in zip(mutated[rows].tolist(), columns.tolist(), new_elements.tolist()):
+        population[i][0][column] = ELEMENTS[element]
     
     return population
         
-def weight_mutation_cp(individual, mutation_rate=0.05):
+def weight_mutation_cp(individual, mutation_rate=0.05, rng=None):
     '''Mutates the weight of an individual, with a certain mutation rate.
     
     Args:
@@ -175,37 +288,74 @@ def weight_mutation_cp(individual, mutation_rate=0.05):
             
       mutation_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       individual: list representing a solution.
     '''
-    value = rd.random()
+    rng = get_rng(rng)
+    value = rng.random()
     weights = individual[1]
     num_elements = len(weights)
     
     if value < mutation_rate:
-        index = rd.sample([i for i in range(num_elements)], num_elements - 1)
+        index = rng.permutation(num_elements)[: num_elements - 1].tolist()
         bound = min(90 - weights[index[0]], 90 - weights[index[1]], weights[index[0]] - 5, weights[index[1]] - 5)
-        weight_added = rd.uniform(-bound, bound) 
+        weight_added = bound * rng.uniform(-1, 1)
         weights[index[0]] += weight_added 
         weights[index[1]] -= weight_added 
         individual[1] = weights
         
     return individual
         
-def population_weight_mutation_cp(population, mutation_rate=0.05):
-    '''Applies the weight mutation to a whole population:
+def population_weight_mutation_cp(population, mutation_rate=0.05, rng=None, copy=False):
+    '''Applies the weight mutation to a whole population. The individuals to mutate, the two weights to change and 
+    the amount exchanged are drawn for the whole population at once, and only the chosen individuals are touched.
     
     Args:
-      population: list of individuals.
+      population: list of individuals, or tuple (elements, weights) of arrays.
             
       mutation_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
+      copy: for populations of arrays, if True the mutation is applied to copies and the input is left untouched. 
+      Otherwise the arrays are changed in place.
+      
     Returns:
-      population: list of individuals.
+      population: list of individuals, or tuple (elements, weights) of arrays.
     
     '''    
-    for individual in population:
-        mutated_individual = weight_mutation_cp(individual, mutation_rate)
+    rng = get_rng(rng)
+    
+    if isinstance(population, tuple):
+        population_size, num_elements = population[1].shape
+    else:
+        population_size = len(population)
+        num_elements = len(population[0][1]) if population_size else 0
+        
+    mutated = np.flatnonzero(rng.random(population_size) < mutation_rate)
+    
+    # Two different positions of each mutated compound exchange some weight
+    index1 = rng.integers(0, num_elements, size=len(mutated))
+    index2 = (index1 + rng.integers(1, num_elements, size=len(mutated))) % num_elements
+    
+    if isinstance(population, tuple):
+        elements, weights = (array.copy() for array in population) if copy else population
+        weight1, weight2 = weights[mutated, index1], weights[mutated, index2]
+        bound = np.minimum.reduce([90 - weight1, 90 - weight2, weight1 - 5, weight2 - 5])
+        weight_added = bound * rng.uniform(-1, 1, size=len(mutated))
+        weights[mutated, index1] += weight_added
+        weights[mutated, index2] -= weight_added
+        return elements, weights
+    
+    amounts = rng.uniform(-1, 1, size=len(mutated))
+    
+    for i, index1, index2, amount in zip(mutated.tolist(), index1.tolist(), index2.tolist(), amounts.tolist()):
+        weights = population[i][1]
+        bound = min(90 - weights[index1], 90 - weights[index2], weights[index1] - 5, weights[index2] - 5)
+        weights[index1] += bound * amount
+        weights[index2] -= bound * amount
         
     return population
         
@@ -213,62 +363,101 @@ def population_weight_mutation_cp(population, mutation_rate=0.05):
 ############################### CROSSOVER OPERATORS ##############################
 ##################################################################################
 
-def pair_crossover_cp(parent1, parent2, crossover_rate=0.5):
-    '''Crossover operator that recombines the weights and elements from two solutions.
+def pair_crossover_cp(parent1, parent2, crossover_rate=0.5, rng=None):
+    '''Crossover operator that recombines the weights and elements from two solutions. The children are new lists.
     
     Args:
       parent1, parent2: individuals representing solutions.
       
       crossover_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       individual1, individual2: individuals representing solutions.
     '''
-    value = rd.random()
+    rng = get_rng(rng)
+    value = rng.random()
     
     if value < crossover_rate:
-        individual1 = [parent1[0], parent2[1]]
-        individual2 = [parent2[0], parent1[1]]
-        return individual1, individual2
+        individual1 = [list(parent1[0]), list(parent2[1])]
+        individual2 = [list(parent2[0]), list(parent1[1])]
     else:
-        return parent1, parent2
+        individual1 = [list(parent1[0]), list(parent1[1])]
+        individual2 = [list(parent2[0]), list(parent2[1])]
+        
+    return individual1, individual2
         
-def population_pair_crossover_cp(population, crossover_rate=0.5):
-    '''Applies the pair crossover to a whole population:
+def population_pair_crossover_cp(population, crossover_rate=0.5, rng=None, copy=True):
+    '''Applies the pair crossover to a whole population. For populations of arrays, the weights of the crossed pairs 
+    are exchanged row by row, and the children are shuffled as in the list path.
     
     Args:
-      population: list of individuals.
+      population: list of individuals, or tuple (elements, weights) of arrays.
             
       crossover_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
+      copy: for populations of arrays, if True the children are new arrays and the input is left untouched. If False, 
+      the input arrays are changed in place.
+      
     Returns:
-      population: list of individuals.
+      population: list of individuals, or tuple (elements, weights) of arrays.
     '''  
+    rng = get_rng(rng)
+    
+    if isinstance(population, tuple):
+        elements, weights = (array.copy() for array in population) if copy else population
+        crossed = 2 * np.flatnonzero(rng.random(len(weights) // 2) < crossover_rate)
+        weights[crossed], weights[crossed + 1] = weights[crossed + 1], weights[crossed]
+        order = rng.permutation(len(weights))
+        elements[:], weights[:] = elements[order], weights[order]
+        return elements, weights
+    
     new_population = []
     
     if len(population) % 2 == 0:
         for parent1, parent2 in zip(population[ : : 2], population[1 : : 2]):
-            individual1, individual2 = pair_crossover_cp(parent1, parent2, crossover_rate)
+            individual1, individual2 = pair_crossover_cp(parent1, parent2, crossover_rate, rng)
             new_population.append(individual1)
             new_population.append(individual2)
-        rd.shuffle(new_population)
+        rng.shuffle(new_population)
         return new_population
     
     else: 
         for parent1, parent2 in zip(population[ : -1 : 2], population[1 : : 2]):
-            individual1, individual2 = pair_crossover_cp(parent1, parent2, crossover_rate)
+            individual1, individual2 = pair_crossover_cp(parent1, parent2, crossover_rate, rng)
             new_population.append(individual1)
             new_population.append(individual2)
             
-        new_population += [population[-1]]
-        rd.shuffle(new_population)
+        new_population += [[list(part) for part in population[-1]]]
+        rng.shuffle(new_population)
         return new_population
 
 ##################################################################################    
 ############################### SELECTION OPERATORS ##############################
 ##################################################################################
     
-def tournament_selection_cp(population, fitness, num_individuals=3):
+def tournament_indices_cp(fitness, num_individuals=3, size=None, rng=None):
+    """Runs all the tournaments of a selection at once, see ga_selection.tournament_indices. Higher fitness wins.
+
+    Args:
+      fitness: list or array of fitness values from the individuals.
+      
+      num_individuals: number of solutions that will participate in each tournament.
+      
+      size: number of tournaments. Defaults to the population size.
+      
+      rng: random generator, see ga_random.get_rng.
+            
+    Returns:
+      indices: integer array with the index of the winner of each tournament.
+
+    """
+    return tournament_indices(fitness, num_individuals, size, False, rng)
+
+def tournament_selection_cp(population, fitness, num_individuals=3, rng=None):
     """Applies selection by tournament.
 
     Args:
@@ -277,41 +466,35 @@ def tournament_selection_cp(population, fitness, num_individuals=3):
       fitness: list of fitness values from the individuals.
       
       num_individuals: number of solutions that will participate in the tournament.
+      
+      rng: random generator, see ga_random.get_rng.
             
     Returns:
       new_population: list of individuals.
 
     """
-    new_population = []
-
-    for _ in range(len(population)):
-        tournament = rd.sample(population, num_individuals)
-
-        tournament_fitness = []
-        for individual in tournament:
-            index = population.index(individual)
-            tournament_fitness.append(fitness[index])
-
-        best_fitness = max(tournament_fitness)
-        index_best_fitness = tournament_fitness.index(best_fitness)
-        selected = tournament[index_best_fitness]
-
-        new_population.append(selected)
-
+    indices = tournament_indices_cp(fitness, num_individuals, rng=rng)
+    new_population = take_individuals(population, indices)
     return new_population
 
-def roulette_selection_cp(population, fitness):
-    """Applies selection by roullete.
+def roulette_selection_cp(population, fitness, method='roulette', rng=None):
+    """Applies selection by roullete. The cumulative weights are computed once, and all the individuals are drawn with 
+    one vectorized search. The weights are the fitness values minus the worst one, see ga_selection.selection_weights.
 
     Args:
-      population: list of individuals.
+      population: list of individuals, or tuple (elements, weights) of arrays.
       
       fitness: list of fitness values from the individuals.
+      
+      method: 'roulette' for independent draws, or 'sus' for stochastic universal sampling, which uses a single random 
+      number for the whole selection.
             
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
-      new_population: list of individuals.
+      new_population: list of individuals, or tuple (elements, weights) of arrays.
 
     """
-    positive_fitness = [i + 2 for i in fitness]
-    new_population = rd.choices(population, positive_fitness, k=len(population))
-    return new_population
\ No newline at end of file
+    indices = selection_indices(fitness, minimize=False, method=method, rng=rng)
+    new_population = take_individuals(population, indices)
+    return new_population
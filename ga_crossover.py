@@ -0,0 +1,58 @@
+'''Crossover helpers shared by the problem modules. Selection returns references for list populations, so one
+individual can stand at several positions of the next generation. The crossovers of every problem therefore return
+children that never share lists with their parents, including the parents that are not crossed, and the mutations
+that update one fitness value per move copy the individuals they change, so no change reaches the other positions.
+'''
+import numpy as np
+
+def ordered_fill(segment, parent):
+    '''Appends to segment the cities of parent that are not in it, in the order they appear in parent. The cities
+    already placed are tracked in a mask, so the fill is linear in the number of cities.
+
+    Args:
+      segment: list of cities copied from the other parent.
+
+      parent: permutation of cities, numbered from 0 to len(parent).
+
+    Returns:
+      individual: new list with the cities of segment followed by the others.
+    '''
+    used = bytearray(len(parent) + 1)
+
+    for gene in segment:
+        used[gene] = 1
+
+    individual = segment + [gene for gene in parent if not used[gene]]
+    return individual
+
+def array_ordered_crossover(parents1, parents2, start_index, end_index):
+    '''Batched ordered crossover on permutations stored as rows. Row i of parents1 and parents2 is crossed on the
+    partition [start_index[i], end_index[i]), and only the first child of each pair is returned, the second one is
+    obtained by swapping the parents.
+
+    Args:
+      parents1, parents2: integer arrays of shape (pairs, size), with values from 0 to size.
+
+      start_index, end_index: integer arrays with the partition of each pair.
+
+    Returns:
+      individuals: integer array of shape (pairs, size).
+    '''
+    pairs, size = parents1.shape
+    rows = np.arange(pairs)[:, np.newaxis]
+    positions = np.arange(size)
+    in_segment = (positions >= start_index[:, np.newaxis]) & (positions < end_index[:, np.newaxis])
+
+    used = np.zeros((pairs, size + 1), dtype=bool)
+    used[rows, parents1] = in_segment
+    kept = ~used[rows, parents2]
+
+    individuals = np.empty_like(parents1)
+    segment_rows, segment_columns = np.nonzero(in_segment)
+    individuals[segment_rows, segment_columns - start_index[segment_rows]] = parents1[segment_rows, segment_columns]
+
+    kept_rows, kept_columns = np.nonzero(kept)
+    destination = (end_index - start_index)[kept_rows] + (np.cumsum(kept, axis=1) - 1)[kept_rows, kept_columns]
+    individuals[kept_rows, destination] = parents2[kept_rows, kept_columns]
+
+    return individuals
@@ -0,0 +1,306 @@
+import copy
+import heapq
+import timeit
+
+import numpy as np
+
+def individual_key(individual):
+    '''Hashable representation of an individual made of lists, tuples, arrays and scalars.'''
+    if isinstance(individual, np.ndarray):
+        return individual.tobytes()
+
+    if isinstance(individual, (list, tuple)):
+        return tuple(individual_key(part) for part in individual)
+
+    if isinstance(individual, np.generic):
+        return individual.item()
+
+    return individual
+
+def take_individual(population, index):
+    '''Returns one individual of a population. For tuples of arrays, the individual is the tuple of its rows.'''
+    if isinstance(population, tuple):
+        return tuple(array[index] for array in population)
+
+    return population[index]
+
+def put_individual(population, index, individual):
+    '''Replaces one individual of a population, in place. For tuples of arrays, individual is a tuple of rows. Rows
+    narrower than the array, kept from before a matrix was widened, are padded with zeros.'''
+    if isinstance(population, tuple):
+        for array, row in zip(population, individual):
+            if np.ndim(row) == 1 and len(row) < array.shape[1]:
+                array[index, len(row) :] = 0
+                array[index, : len(row)] = row
+            else:
+                array[index] = row
+    else:
+        population[index] = individual
+
+class HallOfFame:
+    '''Keeps the best distinct individuals found during a run, with their fitness, up to a fixed number of them. The 
+    individuals are kept in a heap with the worst one at the top, so a candidate is compared to it in constant time and 
+    replaces it in logarithmic time, and the memory does not grow with the number of generations. Individuals are 
+    copied when they enter, so later in-place mutations of the population do not change them.
+
+    Args:
+      size: maximum number of individuals kept.
+
+      minimize: True if lower fitness is better.
+
+      key: function individual -> hashable value, used to keep a single copy of each solution, for example the 
+      individual_key_* functions of the problem modules. Defaults to a key built from the content of the individual.
+    '''
+    def __init__(self, size=10, minimize=True, key=None):
+        self.size = size
+        self.minimize = minimize
+        self.key = key or individual_key
+        self._sign = 1 if minimize else -1
+        self._heap = []
+        self._keys = set()
+        self._counter = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, individual):
+        return self.key(individual) in self._keys
+
+    def update(self, population, fitness, take=None):
+        '''Adds the best individuals of a population, if they are better than the ones already kept.
+
+        Args:
+          population: population of the generation.
+
+          fitness: fitness values of the population.
+
+          take: function (population, index) returning one individual. Defaults to take_individual.
+        '''
+        take = take or take_individual
+        fitness = np.asarray(fitness)
+        if self.size == 0:
+            return
+
+        # Candidates are walked best first, since copies of the best individual can fill any fixed number of them
+        candidates = np.argsort(self._sign * fitness, kind='stable')
+
+        for index in candidates.tolist():
+            value = fitness[index].item()
+
+            # The top of the heap is the worst individual kept, and the next candidates are no better
+            if len(self._heap) == self.size and self._sign * value >= -self._heap[0][0]:
+                break
+
+            individual = take(population, index)
+            key = self.key(individual)
+            if key in self._keys:
+                continue
+
+            # The counter breaks ties, so individuals are never compared
+            entry = (-self._sign * value, self._counter, key, copy.deepcopy(individual))
+            self._counter += 1
+            self._keys.add(key)
+
+            if len(self._heap) < self.size:
+                heapq.heappush(self._heap, entry)
+            else:
+                removed = heapq.heapreplace(self._heap, entry)
+                self._keys.discard(removed[2])
+
+    def items(self):
+        '''Individuals kept and their fitness, best first.
+
+        Returns:
+          items: list of (individual, fitness) tuples.
+        '''
+        entries = sorted(self._heap, key=lambda entry: (-entry[0], entry[1]))
+        return [(individual, self._sign * -score) for score, _, _, individual in entries]
+
+    @property
+    def individuals(self):
+        '''Individuals kept, best first.'''
+        return [individual for individual, _ in self.items()]
+
+    @property
+    def fitness(self):
+        '''Fitness values of the individuals kept, best first.'''
+        return [fitness for _, fitness in self.items()]
+
+    @property
+    def best(self):
+        '''Best individual found and its fitness.'''
+        score, _, _, individual = max(self._heap, key=lambda entry: (entry[0], -entry[1]))
+        return individual, self._sign * -score
+
+class GeneticAlgorithm:
+    '''Generation loop shared by all the problems. Each generation selects, crosses and mutates the population with
+    the operators of the problem, and evaluates every new individual exactly once. The operators are plain callables,
+    so the arguments of the module functions are bound beforehand, for example:
+
+      engine = GeneticAlgorithm(population_ts(POPULATION_SIZE, NUM_CITIES),
+                                evaluate=lambda p: population_fitness_ts(p, CITIES, PENALTY, DISTANCES),
+                                select=roulette_selection_ts,
+                                crossover=lambda p: population_ordered_crossover_ts(p, CROSSOVER_RATE),
+                                mutations=[lambda p: population_switch_mutation_ts(p, MUTATION_RATE)],
+                                generations=GENERATIONS)
+      solution, fitness = engine.run()
+
+    Args:
+      population: initial population, in any format the operators accept.
+
+      evaluate: function population -> fitness values.
+
+      select: function (population, fitness) -> population.
+
+      crossover: function population -> population.
+
+      mutations: list of functions population -> population, applied in order.
+
+      local_search: function population -> population applied between the crossover and the mutations, for example
+      population_local_search_ts with its arguments bound.
+
+      minimize: True if lower fitness is better.
+
+      hof_size: number of individuals kept in the hall of fame.
+
+      generations: stop after this number of generations.
+
+      time_limit: stop after this number of seconds.
+
+      target_fitness: stop once an individual is at least this good.
+
+      take: function (population, index) returning one individual. Defaults to take_individual.
+
+      put: function (population, index, individual) replacing one individual in place. Defaults to put_individual.
+
+      elitism: number of the best individuals found so far copied into each new generation, where they replace the
+      worst offspring and keep the fitness stored in the hall of fame instead of being evaluated again.
+
+      hof_key: key function of the hall of fame, see HallOfFame.
+
+      telemetry: Telemetry from ga_telemetry, receiving the stage times and the statistics of every generation.
+    '''
+    def __init__(self, population, evaluate, select, crossover, mutations=(), minimize=True, hof_size=10,
+                 generations=None, time_limit=None, target_fitness=None, take=None, put=None, elitism=0, hof_key=None,
+                 telemetry=None, local_search=None):
+        self.population = population
+        self.evaluate = evaluate
+        self.select = select
+        self.crossover = crossover
+        self.mutations = list(mutations)
+        self.local_search = local_search
+        self.minimize = minimize
+        self.generations = generations
+        self.time_limit = time_limit
+        self.target_fitness = target_fitness
+        self.take = take or take_individual
+        self.put = put or put_individual
+        self.elitism = elitism
+        self.telemetry = telemetry
+
+        self.hof = HallOfFame(max(hof_size, elitism), minimize, hof_key)
+        self.fitness = None
+        self.generation = 0
+        self.evaluations = 0
+        self.start_time = None
+
+    def _stage(self, name, function, *args):
+        '''Calls function(*args), timed as the stage name when there is a telemetry object.'''
+        if self.telemetry is None:
+            return function(*args)
+
+        with self.telemetry.stage(name):
+            return function(*args)
+
+    def _evaluate(self, population):
+        fitness = self._stage('evaluation', self.evaluate, population)
+        self.evaluations += len(fitness)
+        self._stage('hall_of_fame', self.hof.update, population, fitness, self.take)
+        return fitness
+
+    def _record(self, evaluations):
+        if self.telemetry is not None:
+            self.telemetry.record(self.generation, self.population, self.fitness, self.evaluations - evaluations,
+                                  self.hof, self.minimize)
+
+    def _insert_elites(self, population, fitness):
+        '''Replaces the worst individuals of an evaluated population by copies of the best ones of the hall of fame.'''
+        elites = self.hof.items()[: self.elitism]
+        sign = 1 if self.minimize else -1
+        worst = np.argsort(-sign * np.asarray(fitness), kind='stable')[: len(elites)]
+
+        for position, (individual, value) in zip(worst.tolist(), elites):
+            self.put(population, position, copy.deepcopy(individual))
+            fitness[position] = value
+
+    def initialize(self):
+        '''Evaluates the initial population, if it was not evaluated yet.'''
+        if self.fitness is None:
+            self.fitness = self._evaluate(self.population)
+            self._record(0)
+
+    def step(self):
+        '''Runs one generation.
+
+        Returns:
+          population: the new population.
+
+          fitness: its fitness values.
+        '''
+        self.initialize()
+        evaluations = self.evaluations
+
+        population = self._stage('selection', self.select, self.population, self.fitness)
+        population = self._stage('crossover', self.crossover, population)
+
+        if self.local_search is not None:
+            population = self._stage('local_search', self.local_search, population)
+
+        for mutate in self.mutations:
+            population = self._stage('mutation', mutate, population)
+
+        fitness = self._evaluate(population)
+
+        if self.elitism:
+            self._stage('elitism', self._insert_elites, population, fitness)
+
+        self.population = population
+        self.fitness = fitness
+        self.generation += 1
+        self._record(evaluations)
+        return self.population, self.fitness
+
+    def should_stop(self):
+        '''Checks the stop conditions.'''
+        if self.generations is not None and self.generation >= self.generations:
+            return True
+
+        if self.time_limit is not None and self.start_time is not None:
+            if timeit.default_timer() - self.start_time >= self.time_limit:
+                return True
+
+        if self.target_fitness is not None and len(self.hof):
+            _, best_fitness = self.hof.best
+            if (best_fitness <= self.target_fitness) if self.minimize else (best_fitness >= self.target_fitness):
+                return True
+
+        return False
+
+    def run(self):
+        '''Runs generations until one of the stop conditions is met. At least one condition must be set.
+
+        Returns:
+          solution: best individual found.
+
+          fitness: fitness of the solution.
+        '''
+        if self.generations is None and self.time_limit is None and self.target_fitness is None:
+            raise ValueError('set at least one of generations, time_limit or target_fitness')
+
+        self.start_time = timeit.default_timer()
+        self.initialize()
+
+        while not self.should_stop():
+            self.step()
+
+        return self.hof.best
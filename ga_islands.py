@@ -0,0 +1,126 @@
+import copy
+import multiprocessing as mp
+
+import numpy as np
+
+from ga_random import spawn_seeds
+
+def migration_targets(topology, number_islands):
+    '''Lists the islands each island sends its migrants to.
+
+    Args:
+      topology: 'ring', where island i sends to island i + 1, or 'complete', where every island sends to all others.
+
+      number_islands: number of islands.
+
+    Returns:
+      targets: list with, for each island, the list of islands receiving its migrants.
+    '''
+    if topology == 'ring':
+        return [[(i + 1) % number_islands] if number_islands > 1 else [] for i in range(number_islands)]
+
+    if topology == 'complete':
+        return [[j for j in range(number_islands) if j != i] for i in range(number_islands)]
+
+    raise ValueError(f'unknown topology: {topology}')
+
+def _best_indices(fitness, number, minimize):
+    '''Indices of the best individuals of a population, best first.'''
+    fitness = np.asarray(fitness)
+    order = np.argsort(fitness if minimize else -fitness, kind='stable')
+    return order[: number]
+
+def _island(index, seed, make_engine, generations, migration_interval, migrants, targets, sources, inboxes, results):
+    '''Runs one island: a few generations of its own engine, then an exchange of migrants with its neighbours.'''
+    engine = make_engine(index, np.random.default_rng(seed))
+    engine.initialize()
+
+    pending = {}
+    epoch = 0
+
+    while engine.generation < generations:
+        for _ in range(min(migration_interval, generations - engine.generation)):
+            engine.step()
+
+        chosen = _best_indices(engine.fitness, migrants, engine.minimize)
+        emigrants = [(copy.deepcopy(engine.take(engine.population, i)), engine.fitness[i]) for i in chosen]
+
+        for target in targets:
+            inboxes[target].put((epoch, index, emigrants))
+
+        # Messages of later epochs from faster neighbours wait in pending until their turn
+        while any((epoch, source) not in pending for source in sources):
+            message_epoch, source, individuals = inboxes[index].get()
+            pending[(message_epoch, source)] = individuals
+
+        immigrants = []
+        for source in sorted(sources):
+            immigrants += pending.pop((epoch, source))
+
+        # The immigrants replace the worst individuals, keeping the fitness computed on their island
+        worst = _best_indices(engine.fitness, len(immigrants), not engine.minimize)
+        for position, (individual, fitness) in zip(worst, immigrants):
+            engine.put(engine.population, position, individual)
+            engine.fitness[position] = fitness
+        engine.hof.update(engine.population, engine.fitness, engine.take)
+
+        epoch += 1
+
+    solution, fitness = engine.hof.best
+    results.put((index, solution, fitness, engine.minimize))
+
+def run_islands(make_engine, number_islands, generations, migration_interval=10, migrants=2, topology='ring',
+                seed=None):
+    '''Island model: evolves several populations, each in its own process, and every migration_interval generations
+    sends copies of the best individuals of each island to its neighbours, where they replace the worst ones. Only the
+    migrants travel between processes. Each island gets its own random generator, spawned from seed, and the migrants
+    are always received in the same order, so a run with a given seed is reproducible.
+
+    Args:
+      make_engine: function (island_index, rng) -> GeneticAlgorithm, called inside the island process, where rng is the
+      generator the operators of the island must use. The migrants are read and written with the take and put functions
+      of the engines. With the spawn start method, it must be defined at the top level of a module.
+
+      number_islands: number of islands, each one a process.
+
+      generations: number of generations run on each island. The stop conditions of the engines are not used.
+
+      migration_interval: number of generations between migrations.
+
+      migrants: number of individuals each island sends to each of its neighbours.
+
+      topology: 'ring' or 'complete', see migration_targets.
+
+      seed: integer seed or SeedSequence of the run, or None for a random one.
+
+    Returns:
+      solution: best individual found on all islands.
+
+      fitness: fitness of the solution.
+
+      island_results: list with the (solution, fitness) found by each island.
+    '''
+    targets = migration_targets(topology, number_islands)
+    sources = [[i for i in range(number_islands) if j in targets[i]] for j in range(number_islands)]
+    inboxes = [mp.Queue() for _ in range(number_islands)]
+    results = mp.Queue()
+    seeds = spawn_seeds(seed, number_islands)
+
+    processes = []
+    for index in range(number_islands):
+        process = mp.Process(target=_island, args=(index, seeds[index], make_engine, generations, migration_interval,
+                                                   migrants, targets[index], sources[index], inboxes, results))
+        process.start()
+        processes.append(process)
+
+    island_results = [None] * number_islands
+    for _ in range(number_islands):
+        index, solution, fitness, minimize = results.get()
+        island_results[index] = (solution, fitness)
+
+    for process in processes:
+        process.join()
+
+    sign = 1 if minimize else -1
+    solution, fitness = min(island_results, key=lambda result: sign * result[1])
+    return solution, fitness, island_results
@@ -1,36 +1,47 @@
-import random as rd
 import string 
+import numpy as np
+
+from ga_random import get_rng
+from ga_selection import selection_indices, take_individuals
 
 CHARACTERS = string.ascii_letters + string.digits
+CHARACTER_CODES = np.frombuffer(CHARACTERS.encode(), dtype=np.uint8)
 
-def gene_kw():
+def gene_kw(rng=None):
     '''Returns a possible character in a keyword, including upper and lowercase letters, and digits.
     
+    Args:
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       char: list containing a uppercase or lowercase letter, or a digit.
       '''
-    char = rd.choice(CHARACTERS)
+    rng = get_rng(rng)
+    char = CHARACTERS[rng.integers(0, len(CHARACTERS))]
     return char
     
-def individual_kw(individual_size):
+def individual_kw(individual_size, rng=None):
     '''Creates a keyword with size ranging from size[0] to size[-1].
     
     Args:
       individual_size: list containing the lower and upper limits of the keyword size.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       individual: list representing the keyword.
       '''
-    size_kw = rd.choice([i for i in range(individual_size[0], individual_size[-1] + 1)])
+    rng = get_rng(rng)
+    size_kw = int(rng.integers(individual_size[0], individual_size[-1] + 1))
     individual = []
     
     for _ in range(size_kw):
-        gene = gene_kw()
+        gene = gene_kw(rng)
         individual.append(gene)
         
     return individual
 
-def population_kw(population_size, individual_size):
+def population_kw(population_size, individual_size, array=False, rng=None):
     '''Creates a population of keywords.
     
     Args:
@@ -38,16 +49,67 @@ def population_kw(population_size, individual_size):
       
       individual_size: range of sizes of the keyword.
       
+      array: if True, the population is returned in the array format described in encode_population_kw.
+      
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
-      population: list of individuals.
+      population: list of individuals, or tuple (characters, lengths) of arrays.
     '''
+    rng = get_rng(rng)
+    
+    if array:
+        width = individual_size[-1]
+        lengths = rng.integers(individual_size[0], individual_size[-1] + 1, size=population_size)
+        characters = CHARACTER_CODES[rng.integers(0, len(CHARACTER_CODES), size=(population_size, width))]
+        characters[np.arange(width) >= lengths[:, np.newaxis]] = 0
+        return characters, lengths
+    
     population = []
     
     for _ in range(population_size):
-        individual = individual_kw(individual_size)
+        individual = individual_kw(individual_size, rng)
         population.append(individual)
         
     return population
+
+def encode_population_kw(population, width=None):
+    '''Converts a list population into its array format: a matrix with one byte per character, padded with zeros, and 
+    the length of each individual.
+    
+    Args:
+      population: list of individuals.
+      
+      width: number of columns of the matrix. Defaults to the size of the longest individual.
+      
+    Returns:
+      characters: uint8 array of shape (population_size, width).
+      
+      lengths: integer array with the size of each individual.
+    '''
+    lengths = np.array([len(individual) for individual in population])
+    
+    if width is None:
+        width = lengths.max(initial=0)
+        
+    characters = np.zeros((len(population), width), dtype=np.uint8)
+    
+    for i, individual in enumerate(population):
+        characters[i, : len(individual)] = np.frombuffer(''.join(individual).encode(), dtype=np.uint8)
+        
+    return characters, lengths
+
+def decode_population_kw(population):
+    '''Converts a population in array format back into a list of individuals.
+    
+    Args:
+      population: tuple (characters, lengths) of arrays.
+      
+    Returns:
+      population: list of individuals.
+    '''
+    characters, lengths = population
+    return [list(row[: length].tobytes().decode()) for row, length in zip(characters, lengths)]
         
 def individual_fitness_kw(individual, keyword):
     '''Computes the difference between two possible keywords, according to its characters and sizes. For each corresponding     character, it outputs 1, if they are different, and 0 otherwise. The overall fitness is the sum of all different 
@@ -64,51 +126,77 @@ def individual_fitness_kw(individual, keyword):
     '''
     individual_size = len(individual)
     keyword_size = len(keyword)
-    size_difference = abs(individual_size - keyword_size)
+    fitness = abs(individual_size - keyword_size)
     
-    if individual_size <= keyword_size:
-        fitness = 0
-        for i in range(individual_size):
-            if individual[i] != keyword[i]:
-                fitness += 1
-                
-        fitness += size_difference
-        return fitness 
-    
-    else:
-        fitness = 0
-        for i in range(keyword_size):
-            if individual[i] != keyword[i]:
-                fitness += 1
-                
-        fitness += size_difference
-        return fitness 
+    for i in range(min(individual_size, keyword_size)):
+        if individual[i] != keyword[i]:
+            fitness += 1
+            
+    return fitness 
             
-def population_fitness_kw(population, keyword):
-    '''Calculates the fitness for a population.
+def individual_key_kw(individual):
+    '''Hashable representation of an individual, used as key of a FitnessCache.
     
     Args:
-      population: list of individuals.
+      individual: list of characters.
+      
+    Returns:
+      key: string with the characters of the individual.
+    '''
+    return ''.join(individual)
+        
+def population_fitness_kw(population, keyword, cache=None):
+    '''Calculates the fitness for a population. Array populations are compared with the keyword in one batched 
+    comparison, giving the same values as individual_fitness_kw.
+    
+    Args:
+      population: list of individuals, or tuple (characters, lengths) of arrays.
       
       keyword: actual keyword.
       
+      cache: optional FitnessCache from ga_cache, only for list populations. Individuals already in it are not 
+      evaluated again.
+      
     Returns:
-      population_fitness: list with all fitness values from the individuals in the population.
+      population_fitness: list with all fitness values from the individuals in the population, or array of them for 
+      array populations.
       
     '''
+    if isinstance(population, tuple):
+        return _array_population_fitness_kw(population, keyword)
+    
     population_fitness = []
     
     for individual in population: 
-        fitness = individual_fitness_kw(individual, keyword)
+        if cache is None:
+            fitness = individual_fitness_kw(individual, keyword)
+        else:
+            key = individual_key_kw(individual)
+            fitness = cache.get(key)
+            if fitness is None:
+                fitness = individual_fitness_kw(individual, keyword)
+                cache.put(key, fitness)
         population_fitness.append(fitness)
         
     return population_fitness
 
+def _array_population_fitness_kw(population, keyword):
+    '''Batched version of individual_fitness_kw for a population in array format.'''
+    characters, lengths = population
+    keyword_codes = np.frombuffer(''.join(keyword).encode(), dtype=np.uint8)
+    common = min(characters.shape[1], len(keyword_codes))
+    
+    different = characters[:, : common] != keyword_codes[: common]
+    different &= np.arange(common) < lengths[:, np.newaxis]
+    
+    fitness = different.sum(axis=1) + np.abs(lengths - len(keyword_codes))
+    return fitness
+
 ##################################################################################    
 ############################### MUTATION OPERATORS ###############################
 ##################################################################################
         
-def gene_mutation_kw(individual, mutation_rate=0.05):
+def gene_mutation_kw(individual, mutation_rate=0.05, rng=None):
     '''Mutates one gene from a individual, with a certain mutation rate.
     
     Args:
@@ -116,36 +204,59 @@ def gene_mutation_kw(individual, mutation_rate=0.05):
       
       mutation_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       individual: list representing a solution.
     '''
-    value = rd.random()
+    rng = get_rng(rng)
+    value = rng.random()
     individual_size = len(individual)
     
     if value < mutation_rate:
-        index = rd.randint(0, individual_size - 1)
-        individual[index] = gene_kw()
+        index = int(rng.integers(0, individual_size))
+        individual[index] = gene_kw(rng)
         
     return individual
 
-def population_gene_mutation_kw(population, mutation_rate=0.05):
-    '''Applies the gene mutation to a whole population:
+def population_gene_mutation_kw(population, mutation_rate=0.05, rng=None):
+    '''Applies the gene mutation to a whole population. The individuals to mutate, the positions and the new characters 
+    are drawn for the whole population at once, and only the chosen individuals are touched.
     
     Args:
-      population: list of individuals.
+      population: list of individuals, or tuple (characters, lengths) of arrays, which is mutated in place.
       
       mutation_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
-      population: list of individuals.
+      population: list of individuals, or tuple (characters, lengths) of arrays.
     
     '''    
-    for individual in population:
-        mutated_individual = gene_mutation_kw(individual, mutation_rate)    
+    rng = get_rng(rng)
+    
+    if isinstance(population, tuple):
+        characters, lengths = population
+        mutated = np.flatnonzero((rng.random(len(lengths)) < mutation_rate) & (lengths > 0))
+        index = (rng.random(len(mutated)) * lengths[mutated]).astype(np.intp)
+        characters[mutated, index] = CHARACTER_CODES[rng.integers(0, len(CHARACTER_CODES), size=len(mutated))]
+        return population
+    
+    # Empty individuals are left out before the positions are drawn, as in the array path, so both paths use the same 
+    # random numbers
+    sizes = np.array([len(individual) for individual in population], dtype=np.int64)
+    mutated = np.flatnonzero((rng.random(len(population)) < mutation_rate) & (sizes > 0))
+    fractions = rng.random(len(mutated))
+    genes = rng.integers(0, len(CHARACTERS), size=len(mutated))
+    
+    for i, fraction, gene in zip(mutated.tolist(), fractions.tolist(), genes.tolist()):
+        individual = population[i]
+        individual[int(fraction * len(individual))] = CHARACTERS[gene]
     
     return population
         
-def size_mutation_kw(individual, size, mutation_rate=0.05):
+def size_mutation_kw(individual, size, mutation_rate=0.05, rng=None):
     '''Mutates the size of an individual, with a certain mutation rate. When mutated, the individual gets additional genes, 
     or remover genes.
     
@@ -156,42 +267,81 @@ def size_mutation_kw(individual, size, mutation_rate=0.05):
       
       mutation_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       individual: list representing a solution.
     '''
-    value = rd.random()
+    rng = get_rng(rng)
+    value = rng.random()
     individual_size = len(individual)
     
     if value < mutation_rate:
-        new_size = rd.randint(1, size[-1])
+        new_size = int(rng.integers(1, size[-1] + 1))
         size_difference = new_size - individual_size
         
         if size_difference > 0:
             for _ in range(size_difference):
-                individual += gene_kw()
-            return individual
+                individual.append(gene_kw(rng))
         
         if size_difference < 0:
             for _ in range(1, abs(size_difference) + 1):
                 individual.pop(-1)   
-            return individual
+                
+    return individual
         
-def population_size_mutation_kw(population, size, mutation_rate=0.05):
-    '''Applies the size mutation to a whole population:
+def population_size_mutation_kw(population, size, mutation_rate=0.05, rng=None):
+    '''Applies the size mutation to a whole population. The individuals to mutate and their new sizes are drawn for the 
+    whole population at once, and only the chosen individuals are touched. When a new size is larger than the 
+    character matrix, as for matrices from encode_population_kw, the matrix is widened to the maximum size, so the 
+    returned tuple holds a new characters array.
     
     Args:
-      population: list of individuals.
+      population: list of individuals, or tuple (characters, lengths) of arrays, which is mutated in place.
       
       size: list containing minimum and maximum length of an individual.
       
       mutation_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
-      population: list of individuals.
+      population: list of individuals, or tuple (characters, lengths) of arrays.
     
     '''    
-    for individual in population:
-        mutated_individual = size_mutation_kw(individual, size, mutation_rate)
+    rng = get_rng(rng)
+    
+    if isinstance(population, tuple):
+        characters, lengths = population
+        mutated = np.flatnonzero(rng.random(len(lengths)) < mutation_rate)
+        old_sizes = lengths[mutated]
+        new_sizes = rng.integers(1, size[-1] + 1, size=len(mutated))
+        
+        if new_sizes.max(initial=0) > characters.shape[1]:
+            characters = np.pad(characters, ((0, 0), (0, size[-1] - characters.shape[1])))
+            population = characters, lengths
+        
+        positions = np.arange(characters.shape[1])
+        added = (positions >= old_sizes[:, np.newaxis]) & (positions < new_sizes[:, np.newaxis])
+        removed = (positions >= new_sizes[:, np.newaxis]) & (positions < old_sizes[:, np.newaxis])
+        
+        rows = characters[mutated]
+        rows[added] = CHARACTER_CODES[rng.integers(0, len(CHARACTER_CODES), size=added.sum())]
+        rows[removed] = 0
+        characters[mutated] = rows
+        lengths[mutated] = new_sizes
+        return population
+    
+    mutated = np.flatnonzero(rng.random(len(population)) < mutation_rate)
+    new_sizes = rng.integers(1, size[-1] + 1, size=len(mutated))
+    
+    for i, new_size in zip(mutated.tolist(), new_sizes.tolist()):
+        individual = population[i]
+        if new_size > len(individual):
+            genes = rng.integers(0, len(CHARACTERS), size=new_size - len(individual))
+            individual.extend(CHARACTERS[gene] for gene in genes.tolist())
+        else:
+            del individual[new_size :]
         
     return population
         
@@ -199,21 +349,24 @@ def population_size_mutation_kw(population, size, mutation_rate=0.05):
 ############################### CROSSOVER OPERATORS ##############################
 ##################################################################################
 
-def size_adaptative_crossover_kw(parent1, parent2, crossover_rate=0.5):
-    '''Crossover operator that accounts different size individuals.
+def size_adaptative_crossover_kw(parent1, parent2, crossover_rate=0.5, rng=None):
+    '''Crossover operator that accounts different size individuals. The children are new lists.
     
     Args:
       parent1, parent2: individuals representing solutions.
       
       crossover_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       individual1, individual2: individuals representing solutions.
     '''
+    rng = get_rng(rng)
     parent1_size = len(parent1)
     parent2_size = len(parent2)
     size_difference = parent1_size - parent2_size
-    value = rd.random()
+    value = rng.random()
     
     if value < crossover_rate:
     
@@ -228,59 +381,91 @@ def size_adaptative_crossover_kw(parent1, parent2, crossover_rate=0.5):
             return individual1, individual2
 
         else:
-            return parent1, parent2
+            return list(parent1), list(parent2)
     else: 
-        return parent1, parent2
+        return list(parent1), list(parent2)
         
-def population_size_adaptative_crossover_kw(population, crossover_rate=0.5):
+def population_size_adaptative_crossover_kw(population, crossover_rate=0.5, rng=None):
     '''Applies the size adaptative crossover to a whole population:
     
     Args:
-      population: list of individuals.
+      population: list of individuals, or tuple (characters, lengths) of arrays.
             
       crossover_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
-      population: list of individuals.
+      population: list of individuals, or tuple (characters, lengths) of arrays.
     '''  
+    rng = get_rng(rng)
+    
+    if isinstance(population, tuple):
+        characters, lengths = population
+        pairs = len(lengths) // 2
+        new_characters, new_lengths = characters.copy(), lengths.copy()
+        crossed = 2 * np.flatnonzero(rng.random(pairs) < crossover_rate)
+        
+        # The shorter parent gets the tail of the longer one, and the longer one is cut to the shorter size
+        first_shorter = lengths[crossed] <= lengths[crossed + 1]
+        shorter = np.where(first_shorter, crossed, crossed + 1)
+        longer = np.where(first_shorter, crossed + 1, crossed)
+        minimum_size = lengths[shorter]
+        prefix = np.arange(characters.shape[1]) < minimum_size[:, np.newaxis]
+        
+        new_characters[crossed] = np.where(prefix, characters[shorter], characters[longer])
+        new_characters[crossed + 1] = np.where(prefix, characters[longer], 0)
+        new_lengths[crossed] = lengths[longer]
+        new_lengths[crossed + 1] = minimum_size
+        
+        order = rng.permutation(len(lengths))
+        return new_characters[order], new_lengths[order]
+    
     new_population = []
     
     if len(population) % 2 == 0:
         for parent1, parent2 in zip(population[ : : 2], population[1 : : 2]):
-            individual1, individual2 = size_adaptative_crossover_kw(parent1, parent2, crossover_rate)
+            individual1, individual2 = size_adaptative_crossover_kw(parent1, parent2, crossover_rate, rng)
             new_population.append(individual1)
             new_population.append(individual2)
-        rd.shuffle(new_population)
+        rng.shuffle(new_population)
         return new_population
     
     else: 
         for parent1, parent2 in zip(population[ : -1 : 2], population[1 : : 2]):
-            individual1, individual2 = size_adaptative_crossover_kw(parent1, parent2, crossover_rate)
+            individual1, individual2 = size_adaptative_crossover_kw(parent1, parent2, crossover_rate, rng)
             new_population.append(individual1)
             new_population.append(individual2)
             
-        new_population += [population[-1]]
-        rd.shuffle(new_population)
+        new_population += [list(population[-1])]
+        rng.shuffle(new_population)
         return new_population
 
 ##################################################################################    
 ############################### SELECTION OPERATORS ##############################
 ##################################################################################
     
-def roulette_selection_kw(population, fitness):
-    """Applies selection by roullete.
+def roulette_selection_kw(population, fitness, method='roulette', rng=None):
+    """Applies selection by roullete. The cumulative weights are computed once, and all the individuals are drawn with 
+    one vectorized search. The weights are the inverse fitness values, and individuals equal to the keyword, with 
+    fitness 0, take all the weight, see ga_selection.selection_weights.
 
     Args:
-      population: list of individuals.
+      population: list of individuals, or tuple (characters, lengths) of arrays.
       
       fitness: list of fitness values from the individuals.
+      
+      method: 'roulette' for independent draws, or 'sus' for stochastic universal sampling, which uses a single random 
+      number for the whole selection.
             
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
-      nem_population: list of individuals.
+      new_population: list of individuals, or tuple (characters, lengths) of arrays.
 
     """
-    inverse_fitness = [(1/i) for i in fitness]
-    new_population = rd.choices(population, inverse_fitness, k=len(population))
+    indices = selection_indices(fitness, minimize=True, method=method, rng=rng)
+    new_population = take_individuals(population, indices)
     return new_population
 
 
@@ -0,0 +1,235 @@
+import timeit
+from collections import deque
+
+import numpy as np
+
+class TourLocalSearch:
+    '''2-opt and Or-opt local search on closed tours, used as a memetic stage between the crossover and the mutations.
+    Only the candidate neighbours of each city are tried, and each move is evaluated from the four to six edges it
+    changes, read from the distance matrix, so a move costs the same whatever the number of cities. Cities whose
+    surroundings did not change since they last failed to give an improving move are skipped (don't-look bits), so
+    the search stops when no city is active any more, or when its budget runs out.
+
+    The distance matrix is read through a memoryview, which gives the speed of nested lists without copying it.
+
+    Args:
+      distances: matrix of shape (number_cities, number_cities), for example from distance_matrix_ts.
+
+      neighbours: candidate lists of shape (number_cities, k), from ga_spatial.neighbour_lists.
+
+      or_opt_length: longest segment moved by Or-opt. 0 only uses 2-opt.
+
+      max_moves: maximum number of improving moves applied to each tour.
+
+      time_limit: maximum number of seconds spent on each tour.
+    '''
+    def __init__(self, distances, neighbours, or_opt_length=3, max_moves=None, time_limit=None):
+        self.distances = np.ascontiguousarray(distances)
+        self.neighbours = np.asarray(neighbours).tolist()
+        self.or_opt_length = or_opt_length
+        self.max_moves = max_moves
+        self.time_limit = time_limit
+        self._lookup = memoryview(self.distances)
+
+    def improve(self, tour, split=None):
+        '''Applies improving moves to a tour until it is locally optimal or the budget runs out.
+
+        Args:
+          tour: list of cities, the last one being linked back to the first one.
+
+          split: if given, the first city stays at position 0, and the cities at positions 1 to split and those after
+          split stay in their own block. The moves then only reorder each block, which keeps penalties that depend on
+          the positions of the cities unchanged.
+
+        Returns:
+          tour: improved list of cities, with the same first city when split is given.
+
+          gain: decrease of the tour length.
+        '''
+        number_cities = len(tour)
+        if number_cities < 5:
+            return list(tour), 0.0
+
+        self._tour = tour = list(tour)
+        self._position = position = [-1] * len(self.distances)
+        for index, city in enumerate(tour):
+            position[city] = index
+        self._split = split
+
+        distance = self._lookup
+        neighbours = self.neighbours
+        active = bytearray(len(self.distances))
+        queue = deque(tour)
+        for city in tour:
+            active[city] = 1
+
+        max_moves = self.max_moves
+        deadline = None if self.time_limit is None else timeit.default_timer() + self.time_limit
+        moves = 0
+        gain = 0.0
+
+        while queue:
+            if max_moves is not None and moves >= max_moves:
+                break
+            if deadline is not None and timeit.default_timer() >= deadline:
+                break
+
+            a = queue.popleft()
+            active[a] = 0
+            move = self._two_opt(a, distance, neighbours)
+            if move is None and self.or_opt_length:
+                move = self._or_opt(a, distance, neighbours)
+            if move is None:
+                continue
+
+            delta, touched = move
+            gain -= delta
+            moves += 1
+            for city in touched:
+                if not active[city]:
+                    active[city] = 1
+                    queue.append(city)
+
+        self._tour = self._position = None
+        return tour, gain
+
+    def _allowed(self, first, last):
+        '''Checks that reversing the positions first to last, without wrapping, keeps the blocks given by split.'''
+        split = self._split
+        return 1 <= first <= last and (last <= split or first > split)
+
+    def _reverse(self, first, last):
+        '''Reverses the cities at positions first to last, wrapping around the end of the tour if first > last.'''
+        tour, position = self._tour, self._position
+        number_cities = len(tour)
+        for _ in range(((last - first) % number_cities + 1) // 2):
+            city1, city2 = tour[first], tour[last]
+            tour[first], position[city2] = city2, first
+            tour[last], position[city1] = city1, last
+            first = first + 1 if first + 1 < number_cities else 0
+            last = last - 1 if last > 0 else number_cities - 1
+
+    def _exchange(self, edge1, edge2):
+        '''Replaces the edges leaving positions edge1 and edge2 by reversing the path between them. Returns False if
+        the move is not allowed by split.'''
+        number_cities = len(self._tour)
+        if edge1 > edge2:
+            edge1, edge2 = edge2, edge1
+        first, last = edge1 + 1, edge2
+
+        if self._split is not None:
+            if not self._allowed(first, last):
+                return False
+        elif 2 * (last - first + 1) > number_cities:
+            # Reversing the other side of the tour gives the same cycle with fewer swaps
+            first, last = (edge2 + 1) % number_cities, edge1
+
+        self._reverse(first, last)
+        return True
+
+    def _two_opt(self, a, distance, neighbours):
+        '''Tries the 2-opt moves adding an edge from city a to one of its candidates, on both sides of a. Returns the
+        (delta, touched cities) of the first improving move applied, or None.'''
+        tour, position = self._tour, self._position
+        number_cities = len(tour)
+        position_a = position[a]
+
+        for forward in (True, False):
+            b = tour[(position_a + 1) % number_cities] if forward else tour[position_a - 1]
+            distance_ab = distance[a, b]
+
+            for c in neighbours[a]:
+                distance_ac = distance[a, c]
+                if distance_ac >= distance_ab:
+                    break
+
+                position_c = position[c]
+                if position_c < 0:
+                    continue
+                d = tour[(position_c + 1) % number_cities] if forward else tour[position_c - 1]
+                if d == a:
+                    continue
+
+                delta = distance_ac + distance[b, d] - distance_ab - distance[c, d]
+                if delta < -1e-9:
+                    if forward:
+                        applied = self._exchange(position_a, position_c)
+                    else:
+                        applied = self._exchange((position_a - 1) % number_cities, (position_c - 1) % number_cities)
+                    if applied:
+                        return delta, (a, b, c, d)
+
+        return None
+
+    def _move_segment(self, first, last, edge, reverse):
+        '''Moves the segment at positions first to last between the cities at positions edge and edge + 1, reversed
+        or not, with two or three reversals. Returns False if the move is not allowed by split.'''
+        number_cities = len(self._tour)
+        length = (last - first) % number_cities + 1
+        after = (edge - last) % number_cities
+        before = number_cities - length - after
+
+        # The segment is moved forward, over the cities after it, or backward, over the cities before it
+        forward = after <= before
+        if self._split is not None:
+            if self._allowed(first, edge):
+                forward = True
+            elif self._allowed(edge + 1, last):
+                forward = False
+            else:
+                return False
+
+        if forward:
+            self._reverse(first, edge)
+            self._reverse(first, (first + after - 1) % number_cities)
+            if not reverse:
+                self._reverse((first + after) % number_cities, edge)
+        else:
+            start = (edge + 1) % number_cities
+            self._reverse(start, last)
+            self._reverse((start + length) % number_cities, last)
+            if not reverse:
+                self._reverse(start, (start + length - 1) % number_cities)
+
+        return True
+
+    def _or_opt(self, a, distance, neighbours):
+        '''Tries to move the segments starting at city a, of 1 to or_opt_length cities, next to a candidate of one of
+        their ends. Returns the (delta, touched cities) of the first improving move applied, or None.'''
+        tour, position = self._tour, self._position
+        number_cities = len(tour)
+        first = position[a]
+        previous = tour[first - 1]
+
+        for length in range(1, min(self.or_opt_length, number_cities - 3) + 1):
+            last = (first + length - 1) % number_cities
+            end = tour[last]
+            following = tour[(last + 1) % number_cities]
+            removal = distance[previous, a] + distance[end, following] - distance[previous, following]
+            if removal <= 1e-9:
+                continue
+
+            # Each end of the segment is joined to one of its candidates c, which is placed before or after it
+            for near, far in ((a, end), (end, a)) if length > 1 else ((a, a),):
+                for c in neighbours[near]:
+                    distance_nc = distance[near, c]
+                    if distance_nc >= removal:
+                        break
+
+                    position_c = position[c]
+                    if position_c < 0 or (position_c - first) % number_cities < length:
+                        continue
+
+                    for edge in (position_c, (position_c - 1) % number_cities):
+                        other = tour[(edge + 1) % number_cities] if edge == position_c else tour[edge]
+                        if (position[other] - first) % number_cities < length:
+                            continue
+
+                        delta = distance_nc + distance[far, other] - distance[c, other] - removal
+                        if delta < -1e-9:
+                            # The segment keeps its direction if it is entered by a after c, or left by a before c
+                            reverse = (near == a) != (edge == position_c)
+                            if self._move_segment(first, last, edge, reverse):
+                                return delta, (previous, following, a, end, c, other)
+
+        return None
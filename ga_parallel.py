@@ -0,0 +1,132 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+_WORKER = {}
+
+def _share_array(array, blocks):
+    '''Copies an array into a new shared memory block, and returns the description needed to attach to it.'''
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    shared[...] = array
+    blocks.append(block)
+    return ('shared_array', block.name, array.shape, array.dtype.str)
+
+def _attach_array(argument, blocks):
+    '''Rebuilds an argument in a worker, attaching to its shared memory block when it is a shared array.'''
+    if isinstance(argument, tuple) and len(argument) == 4 and argument[0] == 'shared_array':
+        _, name, shape, dtype = argument
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return argument
+
+def _initialize_worker(fitness_function, args, kwargs):
+    '''Runs once in each worker, storing the fitness function and its arguments for every later chunk.'''
+    blocks = []
+    _WORKER['function'] = fitness_function
+    _WORKER['args'] = [_attach_array(argument, blocks) for argument in args]
+    _WORKER['kwargs'] = {key: _attach_array(argument, blocks) for key, argument in kwargs.items()}
+    _WORKER['blocks'] = blocks
+
+def _evaluate_chunk(chunk):
+    '''Evaluates one slice of the population in a worker.'''
+    return _WORKER['function'](chunk, *_WORKER['args'], **_WORKER['kwargs'])
+
+def _split_population(population, number_chunks):
+    '''Splits a population in contiguous chunks, keeping the order of the individuals.'''
+    if isinstance(population, tuple):
+        population_size = len(population[0])
+    else:
+        population_size = len(population)
+
+    bounds = np.linspace(0, population_size, min(number_chunks, population_size) + 1).astype(int)
+    chunks = []
+
+    for start, end in zip(bounds[: -1], bounds[1 :]):
+        if isinstance(population, tuple):
+            chunks.append(tuple(part[start : end] for part in population))
+        else:
+            chunks.append(population[start : end])
+
+    return chunks
+
+class ParallelEvaluator:
+    '''Evaluates populations on a pool of processes. The population is split in contiguous chunks, each chunk is scored
+    by the serial population fitness function of the problem, and the results are joined back in population order, so
+    they are exactly the values the serial function returns.
+
+    The extra arguments of the fitness function are sent to the workers only once, when the pool starts. Numpy arrays
+    among them, such as the distance matrix, are placed in shared memory instead of being copied to every worker. The
+    PRICE and ATOMIC_WEIGHT tables of the compounds problem are module constants, so the workers already have them.
+
+    Example:
+      evaluator = ParallelEvaluator(population_fitness_ts, CITIES, PENALTY, distances=DISTANCES, workers=32)
+      fitness = evaluator.evaluate(population)
+
+    Args:
+      fitness_function: population fitness function of a module, e.g. population_fitness_ts. It must be defined at the
+      top level of a module, so the workers can import it.
+
+      *args, **kwargs: arguments passed to fitness_function after the population.
+
+      workers: number of processes. Defaults to the number of cores.
+
+      chunks_per_worker: number of chunks given to each worker per evaluation, to balance uneven chunks.
+    '''
+    def __init__(self, fitness_function, *args, workers=None, chunks_per_worker=4, **kwargs):
+        self.workers = workers or os.cpu_count()
+        self.chunks_per_worker = chunks_per_worker
+        self._blocks = []
+
+        shared_args = [self._share(argument) for argument in args]
+        shared_kwargs = {key: self._share(argument) for key, argument in kwargs.items()}
+        self._executor = ProcessPoolExecutor(self.workers, initializer=_initialize_worker,
+                                             initargs=(fitness_function, shared_args, shared_kwargs))
+
+    def _share(self, argument):
+        if isinstance(argument, np.ndarray):
+            return _share_array(argument, self._blocks)
+        return argument
+
+    def evaluate(self, population):
+        '''Calculates the fitness for a population.
+
+        Args:
+          population: population in any format accepted by the fitness function.
+
+        Returns:
+          population_fitness: list of fitness values, or array of them for array populations.
+        '''
+        chunks = _split_population(population, self.workers * self.chunks_per_worker)
+        results = list(self._executor.map(_evaluate_chunk, chunks))
+
+        if not results:
+            return []
+
+        if isinstance(results[0], np.ndarray):
+            return np.concatenate(results)
+
+        population_fitness = []
+        for result in results:
+            population_fitness += result
+
+        return population_fitness
+
+    def close(self):
+        '''Stops the workers and releases the shared memory.'''
+        self._executor.shutdown()
+
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
@@ -0,0 +1,62 @@
+import numpy as np
+
+_default_rng = np.random.default_rng()
+
+def get_rng(rng=None):
+    '''Returns the random generator an operator should use. Every operator of the problem modules takes an rng argument
+    and passes it through this function, so a run is reproducible when all of them get the same generator.
+
+    Args:
+      rng: numpy Generator, used as it is; an integer seed or SeedSequence, used to create a new Generator; or None,
+      for the shared default generator of this module, which can be seeded with seed().
+
+    Returns:
+      rng: numpy Generator.
+    '''
+    if rng is None:
+        return _default_rng
+
+    if isinstance(rng, np.random.Generator):
+        return rng
+
+    return np.random.default_rng(rng)
+
+def seed(value=None):
+    '''Reseeds the shared default generator, used by the operators called without an rng.
+
+    Args:
+      value: integer seed, or None for a seed from the operating system.
+    '''
+    global _default_rng
+    _default_rng = np.random.default_rng(value)
+
+def spawn_seeds(seed, number):
+    '''Creates independent seed sequences from one seed, one for each process, island or repeated run. The children
+    only depend on the seed and on their position, so a run gets the same streams whatever the number of workers.
+    Seed sequences are small and can be sent to other processes.
+
+    Args:
+      seed: integer seed or SeedSequence.
+
+      number: number of independent streams.
+
+    Returns:
+      seeds: list of SeedSequence.
+    '''
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+
+    return seed.spawn(number)
+
+def spawn_rngs(seed, number):
+    '''Creates independent random generators from one seed, see spawn_seeds.
+
+    Args:
+      seed: integer seed or SeedSequence.
+
+      number: number of independent generators.
+
+    Returns:
+      rngs: list of numpy Generators.
+    '''
+    return [np.random.default_rng(child) for child in spawn_seeds(seed, number)]
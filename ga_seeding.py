@@ -0,0 +1,293 @@
+import math as mt
+
+import numpy as np
+
+from ga_random import get_rng
+from ga_spatial import SpatialGrid
+
+SEEDING_STRATEGIES = ('nearest_neighbour', 'greedy_edge', 'space_filling_curve')
+
+def _nearest_available(grid, cells, point, available):
+    '''Nearest city of the grid for which available[index] is true, or None. Unavailable cities are removed from the
+    cell lists when they are met, so each one is only looked at a few times during a whole construction.
+
+    Args:
+      grid: SpatialGrid.
+
+      cells: copy of grid.cells, pruned in place.
+
+      point: (x, y) coordinates.
+
+      available: sequence of booleans, indexed like the cities of the grid.
+    '''
+    center = grid.cell(point)
+    max_radius = grid.max_radius(center)
+    best, best_distance = None, mt.inf
+    x, y = point
+
+    for radius in range(max_radius + 1):
+        for cell in grid.ring_cells(center, radius):
+            indices = cells.get(cell)
+            if not indices:
+                continue
+
+            indices[:] = [index for index in indices if available[index]]
+            for index in indices:
+                dx, dy = grid.coordinates[index, 0] - x, grid.coordinates[index, 1] - y
+                distance = dx * dx + dy * dy
+                if distance < best_distance:
+                    best, best_distance = index, distance
+
+        # Cities in the next ring are at least radius cells away from point
+        if best is not None and best_distance <= (radius * grid.cell_size)**2:
+            break
+
+    return best
+
+def _hilbert_index(x, y, order):
+    '''Position of integer points on the Hilbert curve filling a 2**order by 2**order square.'''
+    size = 1 << order
+    index = np.zeros(len(x), dtype=np.int64)
+    x, y = x.astype(np.int64), y.astype(np.int64)
+    s = size >> 1
+
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        index += s * s * ((3 * rx) ^ ry)
+
+        # Rotates the quadrant so that the curve inside it has the standard orientation
+        flip = ~ry & rx
+        x = np.where(flip, size - 1 - x, x)
+        y = np.where(flip, size - 1 - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        s >>= 1
+
+    return index
+
+class TourBuilder:
+    '''Construction heuristics for closed tours through a set of cities, used to seed the initial populations. The
+    spatial grid and the candidate lists are built once, so many tours can be built from the same object. Every
+    heuristic has a deterministic version and a randomized one, used when a random generator is given.
+
+    Args:
+      coordinates: list or array with the (x, y) coordinates of all the cities of the problem.
+
+      cities: indices of the cities in the tours. Defaults to all of them.
+
+      k: number of candidates of each city for the nearest neighbour and greedy edge heuristics.
+    '''
+    def __init__(self, coordinates, cities=None, k=10):
+        coordinates = np.asarray(coordinates, dtype=np.float64)
+        self.cities = np.arange(len(coordinates)) if cities is None else np.asarray(cities, dtype=np.int64)
+        self.coordinates = coordinates[self.cities]
+        self.grid = SpatialGrid(self.coordinates)
+        self.neighbours = self.grid.neighbour_lists(k)
+
+    def __len__(self):
+        return len(self.cities)
+
+    def _tour(self, local):
+        '''Converts a list of local indices to city indices.'''
+        return self.cities[local].tolist()
+
+    def nearest_neighbour(self, rng=None, start=None, randomness=0.1):
+        '''Nearest neighbour tour: from the start city, always goes to the closest city not visited yet. The
+        candidates are tried first, and the grid is searched only when all of them were visited.
+
+        Args:
+          rng: random generator. If given, the tour starts at a random city, and each step goes to the second closest
+          candidate with probability randomness.
+
+          start: index of the first city, in the cities given to the constructor. Defaults to the first one.
+
+          randomness: value between 0 and 1.
+
+        Returns:
+          tour: list of cities.
+        '''
+        number_cities = len(self)
+        if number_cities == 0:
+            return []
+
+        if rng is not None:
+            rng = get_rng(rng)
+            current = int(rng.integers(0, number_cities)) if start is None else start
+            detours = (rng.random(number_cities) < randomness).tolist()
+        else:
+            current = 0 if start is None else start
+            detours = [False] * number_cities
+
+        available = bytearray(b'\x01') * number_cities
+        cells = {cell: list(indices) for cell, indices in self.grid.cells.items()}
+        neighbours = self.neighbours.tolist()
+        tour = [current]
+        available[current] = 0
+
+        for step in range(1, number_cities):
+            candidates = [index for index in neighbours[current] if available[index]]
+            if candidates:
+                current = candidates[1] if detours[step] and len(candidates) > 1 else candidates[0]
+            else:
+                current = _nearest_available(self.grid, cells, self.coordinates[current], available)
+            tour.append(current)
+            available[current] = 0
+
+        return self._tour(tour)
+
+    def greedy_edge(self, rng=None, noise=0.1):
+        '''Greedy edge tour: goes through the candidate edges from the shortest to the longest, and keeps each one
+        that neither gives a city a third edge nor closes a cycle. The resulting paths are joined end to nearest end.
+
+        Args:
+          rng: random generator. If given, the edge lengths are multiplied by random factors between 1 and 1 + noise
+          before being sorted.
+
+          noise: value above 0.
+
+        Returns:
+          tour: list of cities.
+        '''
+        number_cities = len(self)
+        if number_cities <= 2:
+            return self._tour(list(range(number_cities)))
+
+        k = self.neighbours.shape[1]
+        first = np.repeat(np.arange(number_cities), k)
+        second = self.neighbours.ravel()
+        pairs = np.unique(np.minimum(first, second) * number_cities + np.maximum(first, second))
+        first, second = pairs // number_cities, pairs % number_cities
+
+        lengths = np.hypot(*(self.coordinates[first] - self.coordinates[second]).T)
+        if rng is not None:
+            lengths *= 1 + noise * get_rng(rng).random(len(lengths))
+
+        degree = bytearray(number_cities)
+        parent = list(range(number_cities))
+        links = [[] for _ in range(number_cities)]
+
+        def root(index):
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+
+        order = np.argsort(lengths, kind='stable')
+        for a, b in zip(first[order].tolist(), second[order].tolist()):
+            if degree[a] < 2 and degree[b] < 2:
+                root_a, root_b = root(a), root(b)
+                if root_a != root_b:
+                    parent[root_a] = root_b
+                    degree[a] += 1
+                    degree[b] += 1
+                    links[a].append(b)
+                    links[b].append(a)
+
+        # Every path is walked from one of its ends, and the paths are chained by joining each end to the nearest free
+        # end of another path
+        ends = [index for index in range(number_cities) if degree[index] < 2]
+        available = bytearray(number_cities)
+        for index in ends:
+            available[index] = 1
+        cells = {cell: list(indices) for cell, indices in self.grid.cells.items()}
+
+        tour = []
+        current = ends[0]
+        while current is not None:
+            available[current] = 0
+            previous = None
+            while True:
+                tour.append(current)
+                following = [index for index in links[current] if index != previous]
+                if not following:
+                    break
+                previous, current = current, following[0]
+            available[current] = 0
+            current = _nearest_available(self.grid, cells, self.coordinates[current], available)
+
+        return self._tour(tour)
+
+    def space_filling_curve(self, rng=None, order=16):
+        '''Space filling curve tour: visits the cities in the order of a Hilbert curve through the plane. It only sorts
+        the cities, so it is the fastest heuristic, and about 25% longer than a good tour.
+
+        Args:
+          rng: random generator. If given, the curve is shifted and turned by a random amount.
+
+          order: number of subdivisions of the curve.
+
+        Returns:
+          tour: list of cities.
+        '''
+        if len(self) == 0:
+            return []
+
+        low = self.coordinates.min(axis=0)
+        extent = max((self.coordinates.max(axis=0) - low).max(), 1e-12)
+        size = 1 << order
+        points = (self.coordinates - low) / extent * (size - 1)
+
+        if rng is not None:
+            # The cities are shrunk into half of the square, so the random shift never wraps them around
+            rng = get_rng(rng)
+            points = points / 2 + rng.random(2) * (size // 2)
+            if rng.random() < 0.5:
+                points = points[:, ::-1]
+            if rng.random() < 0.5:
+                points[:, 0] = size - 1 - points[:, 0]
+
+        index = _hilbert_index(points[:, 0].astype(np.int64), points[:, 1].astype(np.int64), order)
+        return self._tour(np.argsort(index, kind='stable'))
+
+    def build(self, strategy, rng=None):
+        '''Builds a tour with one of the SEEDING_STRATEGIES.
+
+        Args:
+          strategy: 'nearest_neighbour', 'greedy_edge' or 'space_filling_curve'.
+
+          rng: random generator for the randomized version, or None for the deterministic one.
+
+        Returns:
+          tour: list of cities.
+        '''
+        if strategy not in SEEDING_STRATEGIES:
+            raise ValueError(f'unknown seeding strategy: {strategy}')
+
+        return getattr(self, strategy)(rng)
+
+def open_tour(tour, start):
+    '''Turns a closed tour into a path beginning after the start city, which is left out.
+
+    Args:
+      tour: list of cities containing start.
+
+      start: city where the path begins.
+
+    Returns:
+      path: list with the other cities, in the order of the tour.
+    '''
+    position = tour.index(start)
+    return tour[position + 1 :] + tour[: position]
+
+def open_tour_between(tour, coordinates, start_point, end_point):
+    '''Turns a closed tour into a path linking two points: it begins at the city closest to start_point, and goes
+    in the direction that ends closer to end_point.
+
+    Args:
+      tour: list of cities.
+
+      coordinates: array with the (x, y) coordinates of all the cities of the problem.
+
+      start_point, end_point: (x, y) coordinates.
+
+    Returns:
+      path: list with the cities of the tour.
+    '''
+    points = coordinates[tour]
+    first = int(np.argmin(((points - start_point)**2).sum(axis=1)))
+    forward = tour[first :] + tour[: first]
+    backward = forward[: 1] + forward[: 0 : -1]
+
+    if ((points[first - 1] - end_point)**2).sum() <= ((points[(first + 1) % len(tour)] - end_point)**2).sum():
+        return forward
+    return backward
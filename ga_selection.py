@@ -0,0 +1,176 @@
+import numpy as np
+
+from ga_random import get_rng
+
+def selection_weights(fitness, minimize=True):
+    '''Turns fitness values into non-negative selection weights.
+
+    When minimizing, the weight of an individual is 1 / fitness, and the fitness values must not be negative. A fitness
+    of 0 is the limit of that rule: if some individuals have it, they share all the weight and the others get none.
+    When maximizing, the weights are the fitness values minus the worst one, so negative fitness values are allowed and
+    the worst individual is never chosen. If all the weights are 0, every individual gets the same weight.
+
+    Args:
+      fitness: list or array of fitness values.
+
+      minimize: True if lower fitness is better.
+
+    Returns:
+      weights: float array of weights.
+    '''
+    fitness = np.asarray(fitness, dtype=np.float64)
+
+    if minimize:
+        perfect = fitness == 0
+        if perfect.any():
+            weights = perfect.astype(np.float64)
+        else:
+            weights = 1 / fitness
+    else:
+        weights = fitness - fitness.min() if len(fitness) else fitness
+
+    if not weights.any():
+        weights = np.ones_like(weights)
+
+    return weights
+
+def cumulative_weights(fitness, minimize=True):
+    '''Cumulative selection weights of a population, computed once and shared by all the draws of a generation.
+
+    Args:
+      fitness: list or array of fitness values.
+
+      minimize: True if lower fitness is better.
+
+    Returns:
+      cumulative: float array, with cumulative[i] the sum of the weights of the individuals 0 to i.
+    '''
+    return np.cumsum(selection_weights(fitness, minimize))
+
+def roulette_indices(cumulative, size, rng=None):
+    '''Draws individuals with probability proportional to their weight, independently, with one vectorized search.
+
+    Args:
+      cumulative: array from cumulative_weights.
+
+      size: number of individuals drawn.
+
+      rng: random generator, see ga_random.get_rng.
+
+    Returns:
+      indices: integer array with the index of each individual drawn.
+    '''
+    rng = get_rng(rng)
+    pointers = rng.random(size) * cumulative[-1]
+    return np.searchsorted(cumulative, pointers, side='right')
+
+def sus_indices(cumulative, size, rng=None, shuffle=True):
+    '''Stochastic universal sampling: draws individuals with probability proportional to their weight, with evenly
+    spaced pointers and a single random offset. Each individual is chosen a number of times within one of its
+    expected count, so the selection has less noise than the roulette.
+
+    Args:
+      cumulative: array from cumulative_weights.
+
+      size: number of individuals drawn.
+
+      rng: random generator, see ga_random.get_rng.
+
+      shuffle: the pointers return the individuals in population order, with copies next to each other. If True, the
+      indices are shuffled so that the crossover does not pair copies of the same individual.
+
+    Returns:
+      indices: integer array with the index of each individual drawn.
+    '''
+    rng = get_rng(rng)
+    step = cumulative[-1] / size
+    pointers = (rng.random() + np.arange(size)) * step
+    indices = np.searchsorted(cumulative, pointers, side='right')
+
+    # Rounding can put the last pointer just past the total
+    np.minimum(indices, len(cumulative) - 1, out=indices)
+
+    if shuffle:
+        rng.shuffle(indices)
+
+    return indices
+
+def selection_indices(fitness, size=None, minimize=True, method='roulette', rng=None):
+    '''Runs a fitness proportionate selection and returns the indices of the individuals chosen.
+
+    Args:
+      fitness: list or array of fitness values.
+
+      size: number of individuals drawn. Defaults to the population size.
+
+      minimize: True if lower fitness is better, see selection_weights.
+
+      method: 'roulette' for independent draws, or 'sus' for stochastic universal sampling.
+
+      rng: random generator, see ga_random.get_rng.
+
+    Returns:
+      indices: integer array with the index of each individual drawn.
+    '''
+    cumulative = cumulative_weights(fitness, minimize)
+
+    if size is None:
+        size = len(cumulative)
+
+    if method == 'roulette':
+        return roulette_indices(cumulative, size, rng)
+
+    if method == 'sus':
+        return sus_indices(cumulative, size, rng)
+
+    raise ValueError(f'unknown selection method: {method}')
+
+def tournament_indices(fitness, num_individuals=3, size=None, minimize=True, rng=None):
+    '''Runs all the tournaments of a selection at once. The participants are drawn as integer indices, with
+    replacement, and the winner of each tournament is read from the fitness array, so no individual is searched for.
+
+    Args:
+      fitness: list or array of fitness values from the individuals.
+
+      num_individuals: number of solutions that will participate in each tournament.
+
+      size: number of tournaments. Defaults to the population size.
+
+      minimize: True if lower fitness wins.
+
+      rng: random generator, see ga_random.get_rng.
+
+    Returns:
+      indices: integer array with the index of the winner of each tournament.
+    '''
+    rng = get_rng(rng)
+    fitness = np.asarray(fitness)
+    population_size = len(fitness)
+
+    if size is None:
+        size = population_size
+
+    participants = rng.integers(0, population_size, size=(size, num_individuals))
+    scores = fitness[participants]
+    winners = np.argmin(scores, axis=1) if minimize else np.argmax(scores, axis=1)
+    indices = participants[np.arange(size), winners]
+    return indices
+
+def take_individuals(population, indices):
+    '''Builds the population of the individuals at some indices.
+
+    Args:
+      population: list of individuals, array with one individual per row, or tuple of such arrays.
+
+      indices: integer array.
+
+    Returns:
+      population: new population in the same format. Lists hold references to the same individuals, arrays are copies.
+    '''
+    if isinstance(population, tuple):
+        return tuple(array[indices] for array in population)
+
+    if isinstance(population, np.ndarray):
+        return population[indices]
+
+    return [population[i] for i in indices.tolist()]
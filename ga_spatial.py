@@ -0,0 +1,162 @@
+import math as mt
+
+import numpy as np
+
+def distance_matrix(cities, dtype=np.float64, block_size=None):
+    '''Computes the euclidean distance between every pair of cities, so the fitness only needs table lookups. The
+    matrix is filled by blocks of rows, so the temporary arrays stay small and a float32 matrix really needs half of
+    the memory of a float64 one.
+
+    Args:
+      cities: list of city coordinates.
+
+      dtype: float type of the matrix. np.float32 halves the memory for large instances.
+
+      block_size: number of rows computed at once. Defaults to blocks of about a million distances.
+
+    Returns:
+      distances: array of shape (number_cities, number_cities), with distances[i, j] the distance from city i to j.
+    '''
+    coordinates = np.asarray(cities, dtype=np.float64).reshape(-1, 2)
+    number_cities = len(coordinates)
+    x, y = coordinates[:, 0], coordinates[:, 1]
+    if block_size is None:
+        block_size = max(1, (1 << 20) // max(number_cities, 1))
+
+    distances = np.empty((number_cities, number_cities), dtype=dtype)
+    for start in range(0, number_cities, block_size):
+        end = min(start + block_size, number_cities)
+        distances[start : end] = np.hypot(x[start : end, np.newaxis] - x, y[start : end, np.newaxis] - y)
+
+    return distances
+
+class SpatialGrid:
+    '''Uniform grid over a set of cities, with about two cities per cell. Nearby cities are found by looking at the
+    cells around a point, ring by ring, instead of computing the distance to every city, so a nearest neighbour query
+    only touches a few cells and the neighbour lists of all cities are built in near-linear time.
+
+    Args:
+      cities: list or array of (x, y) coordinates.
+
+      cell_size: side of the cells. Defaults to a size giving about two cities per cell.
+    '''
+    def __init__(self, cities, cell_size=None):
+        self.coordinates = np.asarray(cities, dtype=np.float64).reshape(-1, 2)
+        number_cities = len(self.coordinates)
+
+        if number_cities:
+            self.origin = self.coordinates.min(axis=0)
+            extent = self.coordinates.max(axis=0) - self.origin
+        else:
+            self.origin = np.zeros(2)
+            extent = np.zeros(2)
+
+        if cell_size is None:
+            area = max(extent[0], 1.0) * max(extent[1], 1.0)
+            cell_size = mt.sqrt(2 * area / max(number_cities, 1))
+        self.cell_size = cell_size
+
+        cells = np.floor((self.coordinates - self.origin) / cell_size).astype(np.int64)
+        self.shape = tuple((cells.max(axis=0) + 1).tolist()) if number_cities else (0, 0)
+        self.cells = {}
+        for index, cell in enumerate(map(tuple, cells.tolist())):
+            self.cells.setdefault(cell, []).append(index)
+
+    def __len__(self):
+        return len(self.coordinates)
+
+    def cell(self, point):
+        '''Cell (column, row) containing a point.'''
+        return (int(mt.floor((point[0] - self.origin[0]) / self.cell_size)),
+                int(mt.floor((point[1] - self.origin[1]) / self.cell_size)))
+
+    def ring_cells(self, center, radius):
+        '''Cells at Chebyshev distance radius from the center cell. Cities in them are at least (radius - 1) *
+        cell_size away from any point of the center cell.'''
+        column, row = center
+        if radius == 0:
+            return [center]
+
+        cells = []
+        for dx in range(-radius, radius + 1):
+            for dy in (-radius, radius) if abs(dx) < radius else range(-radius, radius + 1):
+                cells.append((column + dx, row + dy))
+        return cells
+
+    def max_radius(self, center):
+        '''Radius of the ring from the center cell beyond which there are no more cells of the grid.'''
+        column, row = center
+        return max(abs(column), abs(column - self.shape[0] + 1), abs(row), abs(row - self.shape[1] + 1))
+
+    def _ring(self, center, radius):
+        '''Cities in the cells at Chebyshev distance radius from the center cell.'''
+        found = []
+        for cell in self.ring_cells(center, radius):
+            found += self.cells.get(cell, ())
+        return found
+
+    def query(self, point, k, exclude=None):
+        '''Finds the k cities closest to a point.
+
+        Args:
+          point: (x, y) coordinates.
+
+          k: number of cities returned.
+
+          exclude: index of a city left out of the result, usually the one at point.
+
+        Returns:
+          indices: integer array with the indices of the closest cities, closest first.
+        '''
+        k = min(k, len(self) - (exclude is not None))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+
+        center = self.cell(point)
+        max_radius = self.max_radius(center)
+        candidates = []
+        radius = 0
+
+        while True:
+            candidates += [index for index in self._ring(center, radius) if index != exclude]
+
+            # Cities not seen yet are in cells at least radius + 1 rings away, so at least radius cells from point
+            if len(candidates) >= k:
+                indices = np.array(candidates)
+                differences = self.coordinates[indices] - point
+                distances = np.einsum('ij,ij->i', differences, differences)
+                nearest = np.argpartition(distances, k - 1)[: k]
+                if distances[nearest].max() <= (radius * self.cell_size) ** 2 or radius >= max_radius:
+                    return indices[nearest[np.argsort(distances[nearest], kind='stable')]]
+
+            radius += 1
+
+    def neighbour_lists(self, k=10):
+        '''Candidate lists: the k nearest cities of every city.
+
+        Args:
+          k: number of neighbours of each city.
+
+        Returns:
+          neighbours: integer array of shape (number_cities, k), with the neighbours of city i in row i, closest first.
+        '''
+        k = min(k, len(self) - 1)
+        neighbours = np.empty((len(self), max(k, 0)), dtype=np.int64)
+
+        for index, point in enumerate(self.coordinates):
+            neighbours[index] = self.query(point, k, exclude=index)
+
+        return neighbours
+
+def neighbour_lists(cities, k=10):
+    '''Candidate lists of a set of cities, see SpatialGrid.neighbour_lists.
+
+    Args:
+      cities: list or array of (x, y) coordinates.
+
+      k: number of neighbours of each city.
+
+    Returns:
+      neighbours: integer array of shape (number_cities, k), with the neighbours of city i in row i, closest first.
+    '''
+    return SpatialGrid(cities).neighbour_lists(k)
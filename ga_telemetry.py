@@ -0,0 +1,139 @@
+import json
+import timeit
+from contextlib import contextmanager
+
+import numpy as np
+
+from ga_engine import individual_key, take_individual
+
+class Telemetry:
+    '''Collects, for each generation, the time spent in each stage of the loop and statistics of the population, and
+    passes them to callbacks and to a JSON-lines log, one line per generation. A GeneticAlgorithm given a telemetry
+    object fills it by itself. In a hand-written loop, each stage is wrapped in stage() and record() is called at the
+    end of the generation:
+
+      telemetry = Telemetry(log='run.jsonl', cache=cache)
+      for generation in range(GENERATIONS):
+          with telemetry.stage('selection'):
+              population = roulette_selection_ts(population, fitness)
+          ...
+          telemetry.record(generation, population, fitness, evaluations=len(population))
+
+    Without a telemetry object, the engine only checks that it is None once per stage.
+
+    Args:
+      callbacks: functions record -> None, called with the record of each generation.
+
+      log: path or open file receiving one JSON object per generation.
+
+      cache: FitnessCache used by the evaluation, to report its hit rate.
+
+      diversity: if True, the records include the fraction of distinct individuals in the population. It needs a key
+      for every individual, so it costs about as much as a cached evaluation.
+
+      key: function individual -> hashable value used for the diversity. Defaults to ga_engine.individual_key.
+
+      take: function (population, index) returning one individual. Defaults to ga_engine.take_individual.
+
+      minimize: True if lower fitness is better, used when the records are not made by an engine.
+    '''
+    def __init__(self, callbacks=(), log=None, cache=None, diversity=False, key=None, take=None, minimize=True):
+        self.callbacks = list(callbacks)
+        self.cache = cache
+        self.diversity = diversity
+        self.key = key or individual_key
+        self.take = take or take_individual
+        self.minimize = minimize
+        self.last = None
+
+        self._own_log = isinstance(log, str)
+        self._log = open(log, 'w') if self._own_log else log
+        self._times = {}
+        self._total_evaluations = 0
+        self._cache_counts = (cache.hits, cache.misses) if cache is not None else (0, 0)
+        self._start_time = timeit.default_timer()
+
+    @contextmanager
+    def stage(self, name):
+        '''Context manager adding the time spent in its block to the stage name of the current generation.'''
+        start = timeit.default_timer()
+        try:
+            yield
+        finally:
+            self._times[name] = self._times.get(name, 0.0) + timeit.default_timer() - start
+
+    def record(self, generation, population, fitness, evaluations=None, hof=None, minimize=None):
+        '''Closes a generation: builds its record, sends it to the callbacks and the log, and resets the stage times.
+
+        Args:
+          generation: generation number.
+
+          population: population at the end of the generation.
+
+          fitness: fitness values of the population.
+
+          evaluations: number of fitness evaluations made during the generation.
+
+          hof: HallOfFame of the run, to report the best fitness found so far.
+
+          minimize: True if lower fitness is better. Defaults to the value given to the constructor.
+
+        Returns:
+          record: dictionary with the times of the stages, the evaluation counts, the cache hits and the statistics of
+          the fitness values.
+        '''
+        if minimize is None:
+            minimize = self.minimize
+
+        values = np.asarray(fitness, dtype=np.float64)
+        record = {'generation': generation,
+                  'elapsed': timeit.default_timer() - self._start_time,
+                  'times': self._times}
+
+        if evaluations is not None:
+            self._total_evaluations += evaluations
+            record['evaluations'] = evaluations
+            record['total_evaluations'] = self._total_evaluations
+
+        if self.cache is not None:
+            hits, misses = self.cache.hits - self._cache_counts[0], self.cache.misses - self._cache_counts[1]
+            self._cache_counts = (self.cache.hits, self.cache.misses)
+            record['cache_hits'] = hits
+            record['cache_misses'] = misses
+            record['cache_hit_rate'] = hits / (hits + misses) if hits + misses else 0.0
+
+        if len(values):
+            record['best'] = float(values.min() if minimize else values.max())
+            record['mean'] = float(values.mean())
+            record['worst'] = float(values.max() if minimize else values.min())
+            record['std'] = float(values.std())
+
+        if hof is not None and len(hof):
+            record['hof_best'] = float(hof.best[1])
+
+        if self.diversity and len(values):
+            keys = {self.key(self.take(population, index)) for index in range(len(values))}
+            record['diversity'] = len(keys) / len(values)
+
+        self._times = {}
+        self.last = record
+
+        for callback in self.callbacks:
+            callback(record)
+
+        if self._log is not None:
+            self._log.write(json.dumps(record) + '\n')
+            self._log.flush()
+
+        return record
+
+    def close(self):
+        '''Closes the log, if it was opened from a path.'''
+        if self._own_log and not self._log.closed:
+            self._log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
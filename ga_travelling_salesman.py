@@ -1,40 +1,61 @@
-import random as rd
 import math as mt
+import numpy as np
 
-def cities_ts(number_cities, maximum_coordinate=100):
-    '''Creates a certain number of cities in coordinate format.
+from ga_crossover import array_ordered_crossover, ordered_fill
+from ga_random import get_rng
+from ga_seeding import SEEDING_STRATEGIES, TourBuilder, open_tour, open_tour_between
+from ga_selection import selection_indices, take_individuals
+from ga_spatial import distance_matrix
+
+def cities_ts(number_cities, maximum_coordinate=100, rng=None):
+    '''Creates a certain number of distinct cities in coordinate format. The candidate lists used by the neighbour 
+    operators are built from them with ga_spatial.neighbour_lists.
     
     Args:
       number_cities: number of cities generated.
       
       maximum_coordinate: maximum integer that a coordinate can assume.
     
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       cities: list of coordinates representing cities.
       '''
+    if number_cities > (maximum_coordinate + 1)**2:
+        raise ValueError(f'cannot place {number_cities} distinct cities with coordinates up to {maximum_coordinate}')
+        
+    rng = get_rng(rng)
     cities = []
+    used = set()
     
+    # Coordinates are drawn in batches, and the set of used positions makes each duplicate check constant time
     while len(cities) < number_cities: 
-        city = (rd.randint(0, maximum_coordinate), rd.randint(0, maximum_coordinate))
-        if city not in cities:
-            cities.append(city)
+        for city in map(tuple, rng.integers(0, maximum_coordinate + 1, size=(number_cities - len(cities), 2)).tolist()):
+            if city not in used:
+                used.add(city)
+                cities.append(city)
     return cities
+
+# Same matrix for every problem with cities, see ga_spatial.distance_matrix
+distance_matrix_ts = distance_matrix
     
-def individual_ts(number_cities):
+def individual_ts(number_cities, rng=None):
     '''Creates a sequence of cities with size equal to number_cities - 1. We ommit the starting city, number 0, and the 
     last city, which also would be city number 0.
     
     Args:
       number_cities: integer containing the number of cities.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       individual: list representing the city sequence.
       '''
-    cities = [_ for _ in range(1, number_cities)]
-    individual = rd.sample(cities, len(cities))
+    rng = get_rng(rng)
+    individual = (rng.permutation(number_cities - 1) + 1).tolist()
     return individual
 
-def population_ts(population_size, number_cities):
+def population_ts(population_size, number_cities, array=False, rng=None):
     '''Creates a population of solutions.
     
     Args:
@@ -42,18 +63,80 @@ def population_ts(population_size, number_cities):
       
       number_cities: integer containing the number of cities.
       
+      array: if True, the population is returned as an integer array instead of a list of lists.
+      
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
-      population: list of individuals.
+      population: list of individuals, or array of shape (population_size, number_cities - 1).
     '''
+    rng = get_rng(rng)
+    
+    if array:
+        keys = rng.random((population_size, number_cities - 1))
+        population = np.argsort(keys, axis=1) + 1
+        return population
+    
     population = []
     
     for _ in range(population_size):
-        individual = individual_ts(number_cities)
+        individual = individual_ts(number_cities, rng)
+        population.append(individual)
+        
+    return population
+
+def seeded_population_ts(population_size, cities, fraction=0.1, strategies=SEEDING_STRATEGIES, array=False, 
+                         rng=None):
+    '''Creates a population where a fraction of the individuals are built by construction heuristics, see ga_seeding, 
+    and the others are random. The strategies are used in turn: the first individual of each one is its deterministic 
+    tour, and the next ones are randomized variants. The seeded individuals visit the odd cities first, from the 
+    depot, and then the even ones, so they are not penalized.
+    
+    Args:
+      population_size: number of individuals in the population.
+      
+      cities: list of city coordinates.
+      
+      fraction: value between 0 and 1, share of the population built by the heuristics.
+      
+      strategies: names of the heuristics used, see ga_seeding.SEEDING_STRATEGIES.
+      
+      array: if True, the population is returned as an integer array instead of a list of lists.
+      
+      rng: random generator, see ga_random.get_rng.
+      
+    Returns:
+      population: list of individuals, or array of shape (population_size, number_cities - 1).
+    '''
+    rng = get_rng(rng)
+    number_cities = len(cities)
+    number_seeded = min(population_size, int(round(fraction * population_size)))
+    coordinates = np.asarray(cities, dtype=np.float64)
+    
+    if number_seeded:
+        odd_builder = TourBuilder(coordinates, [0] + list(range(1, number_cities, 2)))
+        even_builder = TourBuilder(coordinates, list(range(2, number_cities, 2)))
+    
+    population = []
+    
+    for i in range(number_seeded):
+        strategy = strategies[i % len(strategies)]
+        variant = rng if i >= len(strategies) else None
+        individual = open_tour(odd_builder.build(strategy, variant), 0)
+        
+        if len(even_builder):
+            end = coordinates[individual[-1]] if individual else coordinates[0]
+            individual += open_tour_between(even_builder.build(strategy, variant), coordinates, end, coordinates[0])
         population.append(individual)
         
+    population += population_ts(population_size - number_seeded, number_cities, rng=rng)
+    
+    if array:
+        return np.array(population, dtype=np.int64).reshape(population_size, number_cities - 1)
+    
     return population
         
-def individual_fitness_ts(individual, cities, penalty=1):
+def individual_fitness_ts(individual, cities, penalty=1, distances=None):
     '''Calculates the total distance in the path followed by a solution. Penalizes even cities first, because of the 
     restriction of the problem.
     
@@ -64,20 +147,28 @@ def individual_fitness_ts(individual, cities, penalty=1):
       
       penalty: integer representing punishment for even cities coming first.
       
+      distances: optional matrix from distance_matrix_ts. When given, the edges are looked up instead of computed.
+      
     Returns:
       fitness: integer.
     '''
     number_cities = len(cities)
-    x0, y0 = cities[0][0], cities[0][1]
-    fitness = mt.sqrt((x0 - cities[individual[0]][0])**2 + (y0 - cities[individual[0]][1])**2)
-    fitness += mt.sqrt((cities[individual[-1]][0] - x0)**2 + (cities[individual[-1]][1] - y0)**2)
     
-    for i in range(number_cities - 2):
-        x1 = cities[individual[i]][0]
-        x2 = cities[individual[i+1]][0]
-        y1 = cities[individual[i]][1]
-        y2 = cities[individual[i+1]][1]
-        fitness += mt.sqrt((x1 - x2)**2 + (y1 - y2)**2)
+    if distances is not None:
+        tour = np.concatenate(([0], individual, [0]))
+        fitness = float(distances[tour[:-1], tour[1:]].sum())
+    
+    else:
+        x0, y0 = cities[0][0], cities[0][1]
+        fitness = mt.sqrt((x0 - cities[individual[0]][0])**2 + (y0 - cities[individual[0]][1])**2)
+        fitness += mt.sqrt((cities[individual[-1]][0] - x0)**2 + (cities[individual[-1]][1] - y0)**2)
+
+        for i in range(number_cities - 2):
+            x1 = cities[individual[i]][0]
+            x2 = cities[individual[i+1]][0]
+            y1 = cities[individual[i]][1]
+            y2 = cities[individual[i+1]][1]
+            fitness += mt.sqrt((x1 - x2)**2 + (y1 - y2)**2)
         
     if penalty == 0:
         return fitness
@@ -93,32 +184,73 @@ def individual_fitness_ts(individual, cities, penalty=1):
     
     return fitness 
         
-def population_fitness_ts(population, cities, penalty=1):
-    '''Calculates the fitness for a population.
+def individual_key_ts(individual):
+    '''Hashable representation of an individual, used as key of a FitnessCache.
+    
+    Args:
+      individual: sequence of cities.
+      
+    Returns:
+      key: tuple of cities.
+    '''
+    return tuple(individual)
+        
+def population_fitness_ts(population, cities, penalty=1, distances=None, cache=None):
+    '''Calculates the fitness for a population. Array populations, as created by population_ts(..., array=True), are 
+    evaluated in a single batched lookup into the distance matrix.
     
     Args:
-      population: list of individuals.
+      population: list of individuals, or integer array of shape (population_size, number_cities - 1).
       
       cities: list of city coordinates.
       
       penalty: integer representing punishment for even cities coming first.
       
+      distances: optional matrix from distance_matrix_ts, built once and reused every generation.
+      
+      cache: optional, only for list populations, FitnessCache from ga_cache. Individuals already in it are not evaluated again.
+      
     Returns:
-      population_fitness: integer.
+      population_fitness: list of fitness values, or array of them for array populations.
     '''
+    if isinstance(population, np.ndarray):
+        if distances is None:
+            distances = distance_matrix_ts(cities)
+        return _array_population_fitness_ts(population, distances, penalty)
+    
     population_fitness = []
     
     for individual in population: 
-        fitness = individual_fitness_ts(individual, cities, penalty)
+        if cache is None:
+            fitness = individual_fitness_ts(individual, cities, penalty, distances)
+        else:
+            key = individual_key_ts(individual)
+            fitness = cache.get(key)
+            if fitness is None:
+                fitness = individual_fitness_ts(individual, cities, penalty, distances)
+                cache.put(key, fitness)
         population_fitness.append(fitness)
         
     return population_fitness
 
+def _array_population_fitness_ts(population, distances, penalty=1):
+    '''Batched version of individual_fitness_ts for a 2D population array.'''
+    number_cities = population.shape[1] + 1
+    
+    fitness = distances[0, population[:, 0]] + distances[population[:, -1], 0]
+    fitness += distances[population[:, :-1], population[:, 1:]].sum(axis=1)
+    
+    if penalty != 0:
+        even_first = (population[:, : number_cities // 2] % 2 == 0).sum(axis=1)
+        fitness += penalty * even_first
+        
+    return fitness
+
 ##################################################################################    
 ############################### MUTATION OPERATORS ###############################
 ##################################################################################
         
-def switch_mutation_ts(individual, mutation_rate=0.05):
+def switch_mutation_ts(individual, mutation_rate=0.05, rng=None):
     '''Exchanges the position of two genes, with a certain mutation rate.
     
     Args:
@@ -126,32 +258,324 @@ def switch_mutation_ts(individual, mutation_rate=0.05):
       
       mutation_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       individual: list representing a solution.
     '''
-    value = rd.random()
+    rng = get_rng(rng)
+    value = rng.random()
     individual_size = len(individual)
     
     if value < mutation_rate:
-        index1, index2 = rd.randint(0, individual_size - 1), rd.randint(0, individual_size - 1)
+        index1, index2 = rng.integers(0, individual_size, size=2).tolist()
         individual[index1], individual[index2] = individual[index2], individual[index1]
         
     return individual
 
-def population_switch_mutation_ts(population, mutation_rate=0.05):
-    '''Applies the gene switch mutation to a whole population:
+def population_switch_mutation_ts(population, mutation_rate=0.05, rng=None):
+    '''Applies the gene switch mutation to a whole population. The individuals to mutate and the positions to switch 
+    are drawn for the whole population at once, and only the chosen individuals are touched.
     
     Args:
-      population: list of individuals.
+      population: list of individuals, or population array.
       
       mutation_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
-      population: list of individuals.
+      population: list of individuals, or population array.
     
     '''    
-    for individual in population:
-        mutated_individual = switch_mutation_ts(individual, mutation_rate)    
+    rng = get_rng(rng)
+    population_size = len(population)
+    
+    if population_size == 0:
+        return population
+    
+    individual_size = len(population[0])
+    mutated = np.flatnonzero(rng.random(population_size) < mutation_rate)
+    index1 = rng.integers(0, individual_size, size=len(mutated))
+    index2 = rng.integers(0, individual_size, size=len(mutated))
+    
+    if isinstance(population, np.ndarray):
+        genes1 = population[mutated, index1]
+        population[mutated, index1] = population[mutated, index2]
+        population[mutated, index2] = genes1
+        return population
+    
+    for i, index1, index2 in zip(mutated.tolist(), index1.tolist(), index2.tolist()):
+        individual = population[i]
+        individual[index1], individual[index2] = individual[index2], individual[index1]
+    
+    return population
+
+def _neighbour_switch_ts(individual, index, neighbour, positions):
+    '''Switches neighbour with the city after position index, or before it at the end of the sequence. positions[city]
+    is the position of city in individual, and is updated with the move.'''
+    if neighbour == 0:
+        return
+    
+    position = positions[neighbour]
+    target = index + 1 if index + 1 < len(individual) else index - 1
+    city = individual[target]
+    individual[target], individual[position] = neighbour, city
+    positions[neighbour], positions[city] = target, position
+
+def _positions_ts(individual):
+    '''Position of every city in an individual, as an array indexed by city, the depot left at -1.'''
+    positions = np.full(len(individual) + 1, -1, dtype=np.int64)
+    positions[individual] = np.arange(len(individual))
+    return positions
+
+def neighbour_switch_mutation_ts(individual, neighbours, mutation_rate=0.05, rng=None, positions=None):
+    '''Places a city next to one of its nearest neighbours, with a certain mutation rate. A random city of the
+    individual is chosen, then one of its candidates, which is switched with the city that follows the chosen one. The
+    new edge joins two close cities, instead of two random ones as in switch_mutation_ts.
+      
+    Args:
+      individual: list representing a solution.
+      
+      neighbours: candidate lists from ga_spatial.neighbour_lists.
+      
+      mutation_rate: value between 0 and 1.
+      
+      rng: random generator, see ga_random.get_rng.
+      
+      positions: optional array with the position of each city in individual, kept up to date by the move, so the 
+      neighbour is found without searching the individual. Built if not given.
+      
+    Returns:
+      individual: list representing a solution.
+    '''
+    rng = get_rng(rng)
+    value = rng.random()
+    
+    if value < mutation_rate:
+        index = int(rng.integers(0, len(individual)))
+        neighbour = int(neighbours[individual[index], rng.integers(0, neighbours.shape[1])])
+        if positions is None:
+            positions = _positions_ts(individual)
+        _neighbour_switch_ts(individual, index, neighbour, positions)
+    
+    return individual
+
+def population_neighbour_switch_mutation_ts(population, neighbours, mutation_rate=0.05, rng=None):
+    '''Applies the neighbour switch mutation to a whole population. The individuals to mutate, the cities and their
+    candidates are drawn for the whole population at once, and only the chosen individuals are touched.
+      
+    Args:
+      population: list of individuals, or population array.
+      
+      neighbours: candidate lists from ga_spatial.neighbour_lists.
+      
+      mutation_rate: value between 0 and 1.
+      
+      rng: random generator, see ga_random.get_rng.
+      
+    Returns:
+      population: list of individuals, or population array.
+    '''
+    rng = get_rng(rng)
+    population_size = len(population)
+    
+    if population_size == 0:
+        return population
+    
+    individual_size = len(population[0])
+    mutated = np.flatnonzero(rng.random(population_size) < mutation_rate)
+    index = rng.integers(0, individual_size, size=len(mutated))
+    ranks = rng.integers(0, neighbours.shape[1], size=len(mutated))
+    
+    if isinstance(population, np.ndarray):
+        neighbour = neighbours[population[mutated, index], ranks]
+    
+        # The depot is not part of the individuals
+        valid = neighbour != 0
+        mutated, index, neighbour = mutated[valid], index[valid], neighbour[valid]
+    
+        position = np.argmax(population[mutated] == neighbour[:, np.newaxis], axis=1)
+        target = np.where(index + 1 < individual_size, index + 1, index - 1)
+        genes = population[mutated, target]
+        population[mutated, target] = population[mutated, position]
+        population[mutated, position] = genes
+        return population
+    
+    for i, index, rank in zip(mutated.tolist(), index.tolist(), ranks.tolist()):
+        individual = population[i]
+        _neighbour_switch_ts(individual, index, int(neighbours[individual[index], rank]), _positions_ts(individual))
+    
+    return population
+
+def switch_delta_ts(individual, index1, index2, distances, penalty=1):
+    '''Computes the change in fitness caused by exchanging two genes, without applying it. Only the edges around both 
+    positions and the penalty of both positions are looked at, so the cost does not depend on the number of cities.
+    
+    Args:
+      individual: sequence of cities.
+      
+      index1, index2: positions that would be exchanged.
+      
+      distances: matrix from distance_matrix_ts.
+      
+      penalty: integer representing punishment for even cities coming first.
+      
+    Returns:
+      delta: fitness after the exchange minus fitness before it.
+    '''
+    if index1 == index2:
+        return 0.0
+    
+    individual_size = len(individual)
+    swapped = {index1: individual[index2], index2: individual[index1]}
+    delta = 0.0
+    
+    # Edge k joins positions k and k + 1, with the depot on both ends of the individual
+    for k in {index1 - 1, index1, index2 - 1, index2}:
+        city1 = individual[k] if k >= 0 else 0
+        city2 = individual[k + 1] if k + 1 < individual_size else 0
+        new_city1 = swapped.get(k, city1)
+        new_city2 = swapped.get(k + 1, city2)
+        delta += distances[new_city1, new_city2] - distances[city1, city2]
+        
+    if penalty != 0:
+        half = (individual_size + 1) // 2
+        for index in (index1, index2):
+            if index < half:
+                delta += penalty * (int(swapped[index] % 2 == 0) - int(individual[index] % 2 == 0))
+                
+    return float(delta)
+
+def switch_mutation_delta_ts(individual, distances, penalty=1, mutation_rate=0.05, rng=None):
+    '''Same as switch_mutation_ts, but also returns the fitness change of the move, computed by switch_delta_ts.
+    
+    Args:
+      individual: list representing a solution.
+      
+      distances: matrix from distance_matrix_ts.
+      
+      penalty: integer representing punishment for even cities coming first.
+      
+      mutation_rate: value between 0 and 1.
+      
+      rng: random generator, see ga_random.get_rng.
+      
+    Returns:
+      individual: list representing a solution.
+      
+      delta: fitness change, 0 when the individual was not mutated.
+    '''
+    rng = get_rng(rng)
+    value = rng.random()
+    individual_size = len(individual)
+    delta = 0.0
+    
+    if value < mutation_rate:
+        index1, index2 = rng.integers(0, individual_size, size=2).tolist()
+        delta = switch_delta_ts(individual, index1, index2, distances, penalty)
+        individual[index1], individual[index2] = individual[index2], individual[index1]
+        
+    return individual, delta
+
+def population_switch_mutation_delta_ts(population, fitness, distances, penalty=1, mutation_rate=0.05, rng=None):
+    '''Applies the gene switch mutation to a whole population whose fitness is already known, updating the fitness 
+    values with the deltas of the moves instead of evaluating the mutants again. Mutated list individuals are copies.
+    
+    Args:
+      population: list of individuals, or population array.
+      
+      fitness: fitness values of the population, before the mutation.
+      
+      distances: matrix from distance_matrix_ts.
+      
+      penalty: integer representing punishment for even cities coming first.
+      
+      mutation_rate: value between 0 and 1.
+      
+      rng: random generator, see ga_random.get_rng.
+      
+    Returns:
+      population: list of individuals, or population array.
+      
+      population_fitness: fitness values of the mutated population, as a list, or an array for population arrays.
+    '''
+    rng = get_rng(rng)
+    array = isinstance(population, np.ndarray)
+    population_fitness = np.array(fitness, dtype=np.float64) if array else list(fitness)
+    population_size = len(population)
+    
+    if population_size == 0:
+        return population, population_fitness
+    
+    individual_size = len(population[0])
+    mutated = np.flatnonzero(rng.random(population_size) < mutation_rate)
+    index1 = rng.integers(0, individual_size, size=len(mutated))
+    index2 = rng.integers(0, individual_size, size=len(mutated))
+    
+    for i, index1, index2 in zip(mutated.tolist(), index1.tolist(), index2.tolist()):
+        individual = population[i]
+        
+        # Copied, since selection may share it with other positions, see ga_crossover
+        if not array:
+            individual = population[i] = list(individual)
+        population_fitness[i] += switch_delta_ts(individual, index1, index2, distances, penalty)
+        individual[index1], individual[index2] = individual[index2], individual[index1]
+            
+    return population, population_fitness
+
+##################################################################################    
+############################### LOCAL SEARCH #####################################
+##################################################################################
+
+def local_search_ts(individual, search, penalty=1):
+    '''Improves a solution with the 2-opt and Or-opt moves of a TourLocalSearch, see ga_local_search. The path is 
+    closed by the depot, which stays at its place. When there is a penalty, the moves keep the first half of the 
+    path apart from the second one, so the penalty does not change and the length is the only thing improved.
+    
+    Args:
+      individual: sequence of cities.
+      
+      search: TourLocalSearch built on the distance matrix and the neighbour lists of the cities.
+      
+      penalty: integer representing punishment for even cities coming first.
+      
+    Returns:
+      individual: list representing the improved solution.
+      
+      gain: decrease of the fitness.
+    '''
+    tour = [0] + (individual.tolist() if isinstance(individual, np.ndarray) else list(individual))
+    tour, gain = search.improve(tour, len(tour) // 2 if penalty else None)
+    
+    # Without blocks to keep, the depot may have been moved by the reversals
+    position = tour.index(0)
+    return tour[position + 1 :] + tour[: position], gain
+
+def population_local_search_ts(population, search, penalty=1, search_rate=1.0, rng=None):
+    '''Applies the local search to a share of the population, as a memetic stage between the crossover and the 
+    mutations. The budget of each individual is set by the max_moves and time_limit of the search.
+    
+    Args:
+      population: list of individuals, or population array.
+      
+      search: TourLocalSearch built on the distance matrix and the neighbour lists of the cities.
+      
+      penalty: integer representing punishment for even cities coming first.
+      
+      search_rate: value between 0 and 1, probability of improving each individual.
+      
+      rng: random generator, see ga_random.get_rng.
+      
+    Returns:
+      population: list of individuals, or population array.
+    '''
+    rng = get_rng(rng)
+    improved = np.flatnonzero(rng.random(len(population)) < search_rate) if search_rate < 1 else range(len(population))
+    
+    for i in improved:
+        individual, _ = local_search_ts(population[i], search, penalty)
+        population[i] = individual
     
     return population
         
@@ -159,85 +583,111 @@ def population_switch_mutation_ts(population, mutation_rate=0.05):
 ############################### CROSSOVER OPERATORS ##############################
 ##################################################################################
 
-def ordered_crossover_ts(parent1, parent2, crossover_rate=0.5):
+def ordered_crossover_ts(parent1, parent2, crossover_rate=0.5, rng=None):
     '''Applies the ordered crossover to two parents. It selects a partition of both parents, and creates two more lists 
     with them. After, it appends the rest of the elements that are not in the new individuals, following the order in which 
-    they appear in the other parent.
+    they appear in the other parent. The cities already placed are tracked in a mask, so the crossover is linear in the 
+    number of cities. The children are new lists.
     
     Args:
       parent1, parent2: possible solutions.
       
       crossover_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       individual1, individual2: possible solutions.
     '''
-    size = len(parent1)
-    start_index = rd.randint(0, size - 2)
-    end_index = rd.randint(start_index + 2, size)
+    rng = get_rng(rng)
+    value = rng.random()
+    if value < crossover_rate:
+        size = len(parent1)
+        start_index = int(rng.integers(0, size - 1))
+        end_index = int(rng.integers(start_index + 2, size + 1))
 
-    individual1 = parent1[start_index : end_index]
-    individual2 = parent2[start_index : end_index]
-    
-    for gene in parent2:
-        if gene not in individual1:
-            individual1.append(gene)
-    
-    for gene in parent1:
-        if gene not in individual2:
-            individual2.append(gene)
+        individual1 = ordered_fill(parent1[start_index : end_index], parent2)
+        individual2 = ordered_fill(parent2[start_index : end_index], parent1)
+
+        return individual1, individual2
     
-    return individual1, individual2
- 
-def population_ordered_crossover_ts(population, crossover_rate=0.5):
-    '''Applies the ordered crossover to a whole population:
+    else:
+        return list(parent1), list(parent2)
+
+def population_ordered_crossover_ts(population, crossover_rate=0.5, rng=None):
+    '''Applies the ordered crossover to a whole population. Array populations are crossed in one batched call.
     
     Args:
-      population: list of individuals.
+      population: list of individuals, or population array.
             
       crossover_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
-      population: list of individuals.
+      population: list of individuals, or population array.
     '''  
+    rng = get_rng(rng)
+    
+    if isinstance(population, np.ndarray):
+        population_size, size = population.shape
+        pairs = population_size // 2
+        parents1, parents2 = population[0 : 2 * pairs : 2], population[1 : 2 * pairs : 2]
+        
+        new_population = population.copy()
+        crossed = np.flatnonzero(rng.random(pairs) < crossover_rate)
+        start_index = rng.integers(0, size - 1, size=len(crossed))
+        end_index = rng.integers(start_index + 2, size + 1)
+        new_population[2 * crossed] = array_ordered_crossover(parents1[crossed], parents2[crossed], 
+                                                              start_index, end_index)
+        new_population[2 * crossed + 1] = array_ordered_crossover(parents2[crossed], parents1[crossed], 
+                                                                  start_index, end_index)
+        return new_population[rng.permutation(population_size)]
+    
     new_population = []
     
     if len(population) % 2 == 0:
         for parent1, parent2 in zip(population[ : : 2], population[1 : : 2]):
-            individual1, individual2 = ordered_crossover_ts(parent1, parent2, crossover_rate)
+            individual1, individual2 = ordered_crossover_ts(parent1, parent2, crossover_rate, rng)
             new_population.append(individual1)
             new_population.append(individual2)
-        rd.shuffle(new_population)
+        rng.shuffle(new_population)
         return new_population
     
     else: 
         for parent1, parent2 in zip(population[ : -1 : 2], population[1 : : 2]):
-            individual1, individual2 = ordered_crossover_ts(parent1, parent2, crossover_rate)
+            individual1, individual2 = ordered_crossover_ts(parent1, parent2, crossover_rate, rng)
             new_population.append(individual1)
             new_population.append(individual2)
             
-        new_population += [population[-1]]
-        rd.shuffle(new_population)
+        new_population += [list(population[-1])]
+        rng.shuffle(new_population)
         return new_population
 
 ##################################################################################    
 ############################### SELECTION OPERATORS ##############################
 ##################################################################################
     
-def roulette_selection_ts(population, fitness):
-    """Applies selection by roullete.
+def roulette_selection_ts(population, fitness, method='roulette', rng=None):
+    """Applies selection by roullete. The cumulative weights are computed once, and all the individuals are drawn with 
+    one vectorized search. The weights are the inverse fitness values, see ga_selection.selection_weights.
 
     Args:
-      population: list of individuals.
+      population: list of individuals, or array with one individual per row.
       
       fitness: list of fitness values from the individuals.
+      
+      method: 'roulette' for independent draws, or 'sus' for stochastic universal sampling, which uses a single random 
+      number for the whole selection.
             
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
-      nem_population: list of individuals.
+      new_population: list of individuals, or array with one individual per row.
 
     """
-    inverse_fitness = [(1/i) for i in fitness]
-    new_population = rd.choices(population, inverse_fitness, k=len(population))
+    indices = selection_indices(fitness, minimize=True, method=method, rng=rng)
+    new_population = take_individuals(population, indices)
     return new_population
 
 
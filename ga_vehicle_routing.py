@@ -1,26 +1,45 @@
-import random as rd
 import math as mt
+import numpy as np
 
-def cities_vr(number_cities, maximum_coordinate=100):
-    '''Creates a certain number of cities in coordinate format.
+from ga_crossover import array_ordered_crossover, ordered_fill
+from ga_random import get_rng
+from ga_seeding import SEEDING_STRATEGIES, TourBuilder, open_tour
+from ga_selection import selection_indices, take_individuals, tournament_indices
+from ga_spatial import distance_matrix
+
+def cities_vr(number_cities, maximum_coordinate=100, rng=None):
+    '''Creates a certain number of distinct cities in coordinate format. The candidate lists used by the neighbour 
+    operators are built from them with ga_spatial.neighbour_lists.
     
     Args:
       number_cities: number of cities generated.
       
       maximum_coordinate: maximum integer that a coordinate can assume.
     
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       cities: list of coordinates representing cities.
       '''
+    if number_cities > (maximum_coordinate + 1)**2:
+        raise ValueError(f'cannot place {number_cities} distinct cities with coordinates up to {maximum_coordinate}')
+        
+    rng = get_rng(rng)
     cities = []
+    used = set()
     
+    # Coordinates are drawn in batches, and the set of used positions makes each duplicate check constant time
     while len(cities) < number_cities: 
-        city = (rd.randint(0, maximum_coordinate), rd.randint(0, maximum_coordinate))
-        if city not in cities:
-            cities.append(city)
+        for city in map(tuple, rng.integers(0, maximum_coordinate + 1, size=(number_cities - len(cities), 2)).tolist()):
+            if city not in used:
+                used.add(city)
+                cities.append(city)
     return cities
+
+# Same matrix for every problem with cities, see ga_spatial.distance_matrix
+distance_matrix_vr = distance_matrix
     
-def individual_vr(number_cities, number_vehicles):
+def individual_vr(number_cities, number_vehicles, rng=None):
     '''Creates a sequence of cities with size equal to number_cities - 1. We ommit the starting city, number 0, and the 
     last city, which also would be city number 0. Then, it separates the list into separate routes, one for each vehicle. 
     
@@ -29,13 +48,15 @@ def individual_vr(number_cities, number_vehicles):
       
       number_vehicles: integer number of vehicles in the problem.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       individual: list representing the city sequence, with each sublist being the route of one vehicle.
       '''
+    rng = get_rng(rng)
     individual = []
-    cities = [_ for _ in range(1, number_cities)]
-    total_individual = rd.sample(cities, len(cities)) 
-    partitions = rd.sample([_ for _ in range(1, number_cities - 1)], number_vehicles - 1)
+    total_individual = (rng.permutation(number_cities - 1) + 1).tolist()
+    partitions = (rng.permutation(number_cities - 2)[: number_vehicles - 1] + 1).tolist()
     partitions.sort()
     
     for i in range(len(partitions)):
@@ -51,7 +72,7 @@ def individual_vr(number_cities, number_vehicles):
             
     return individual
 
-def population_vr(population_size, number_cities, number_vehicles):
+def population_vr(population_size, number_cities, number_vehicles, array=False, rng=None):
     '''Creates a population of solutions.
     
     Args:
@@ -61,28 +82,260 @@ def population_vr(population_size, number_cities, number_vehicles):
       
       number_vehicles: integer number of vehicles in the problem.
       
+      array: if True, the population is returned in the flattened format described in flatten_population_vr.
+      
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
-      individual: list representing the city sequence, with each sublist being the route of one vehicle.
+      population: list of individuals, or tuple (tours, offsets) of arrays.
       '''
+    rng = get_rng(rng)
+    
+    if array:
+        tours = np.argsort(rng.random((population_size, number_cities - 1)), axis=1) + 1
+        partitions = np.argsort(rng.random((population_size, number_cities - 2)), axis=1)[:, : number_vehicles - 1] + 1
+        partitions.sort(axis=1)
+        offsets = np.zeros((population_size, number_vehicles + 1), dtype=tours.dtype)
+        offsets[:, 1 : -1] = partitions
+        offsets[:, -1] = number_cities - 1
+        return tours, offsets
+    
     population = []
     
     for _ in range(population_size):
-        individual = individual_vr(number_cities, number_vehicles)
+        individual = individual_vr(number_cities, number_vehicles, rng)
         population.append(individual)
         
     return population
+
+def split_tour_vr(tour, cities, number_vehicles):
+    '''Splits a giant tour into routes, one for each vehicle, where it costs the least. Splitting between cities a and b 
+    replaces the edge a-b by the edges a-0 and 0-b, so the number_vehicles - 1 splits with the smallest extra length 
+    are chosen.
+    
+    Args:
+      tour: list with all the cities except the depot.
+      
+      cities: list of city coordinates.
+      
+      number_vehicles: integer number of vehicles in the problem.
+      
+    Returns:
+      individual: list of routes.
+    '''
+    coordinates = np.asarray(cities, dtype=np.float64)
+    points = coordinates[tour]
+    to_depot = np.hypot(*(points - coordinates[0]).T)
+    along = np.hypot(*(points[1 :] - points[: -1]).T)
+    costs = to_depot[: -1] + to_depot[1 :] - along
+    
+    splits = np.sort(np.argpartition(costs, number_vehicles - 2)[: number_vehicles - 1] + 1).tolist()
+    bounds = [0] + splits + [len(tour)]
+    individual = [list(tour[bounds[k] : bounds[k + 1]]) for k in range(number_vehicles)]
+    return individual
+
+def seeded_population_vr(population_size, cities, number_vehicles, fraction=0.1, strategies=SEEDING_STRATEGIES, 
+                         array=False, rng=None):
+    '''Creates a population where a fraction of the individuals are built by construction heuristics, see ga_seeding, 
+    and the others are random. Each heuristic builds one giant tour through all the cities, which split_tour_vr cuts 
+    into routes. The strategies are used in turn: the first individual of each one is its deterministic tour, and the 
+    next ones are randomized variants.
+    
+    Args:
+      population_size: number of individuals in the population.
+      
+      cities: list of city coordinates.
+      
+      number_vehicles: integer number of vehicles in the problem.
+      
+      fraction: value between 0 and 1, share of the population built by the heuristics.
+      
+      strategies: names of the heuristics used, see ga_seeding.SEEDING_STRATEGIES.
+      
+      array: if True, the population is returned in the flattened format described in flatten_population_vr.
+      
+      rng: random generator, see ga_random.get_rng.
+      
+    Returns:
+      population: list of individuals, or tuple (tours, offsets) of arrays.
+    '''
+    rng = get_rng(rng)
+    number_cities = len(cities)
+    number_seeded = min(population_size, int(round(fraction * population_size)))
+    
+    if number_seeded:
+        builder = TourBuilder(cities)
+    
+    population = []
+    
+    for i in range(number_seeded):
+        strategy = strategies[i % len(strategies)]
+        variant = rng if i >= len(strategies) else None
+        tour = open_tour(builder.build(strategy, variant), 0)
+        population.append(split_tour_vr(tour, cities, number_vehicles))
+        
+    population += population_vr(population_size - number_seeded, number_cities, number_vehicles, rng=rng)
+    
+    if array:
+        return flatten_population_vr(population)
+    
+    return population
+
+def flatten_population_vr(population):
+    '''Converts a list population into its flattened format. Each individual becomes one giant tour, the concatenation 
+    of its routes, and a row of offsets marking where each route starts and ends in that tour.
+    
+    Args:
+      population: list of individuals, all with the same number of cities and routes.
+      
+    Returns:
+      tours: integer array of shape (population_size, number_cities - 1).
+      
+      offsets: integer array of shape (population_size, number_vehicles + 1). Route k of individual i is 
+      tours[i, offsets[i, k] : offsets[i, k + 1]].
+    '''
+    tours = np.array([[city for route in individual for city in route] for individual in population])
+    lengths = np.array([[len(route) for route in individual] for individual in population])
+    offsets = np.zeros((lengths.shape[0], lengths.shape[1] + 1), dtype=tours.dtype)
+    np.cumsum(lengths, axis=1, out=offsets[:, 1 :])
+    return tours, offsets
+
+def unflatten_population_vr(tours, offsets):
+    '''Converts a flattened population back into a list of individuals.
+    
+    Args:
+      tours, offsets: flattened population, as returned by flatten_population_vr.
+      
+    Returns:
+      population: list of individuals.
+    '''
+    population = []
+    
+    for tour, offset in zip(tours.tolist(), offsets.tolist()):
+        individual = [tour[offset[k] : offset[k + 1]] for k in range(len(offset) - 1)]
+        population.append(individual)
+        
+    return population
+        
+class Route(list):
+    '''List of the cities visited by one vehicle, which also carries its length. The length is only valid while dirty 
+    is False: operators that change a route in place set dirty, or update the length when they know the change, and 
+    the evaluation only measures the dirty routes again. Routes built as plain lists, for example by the crossover, 
+    have no cached length and are always measured.
+    
+    Args:
+      cities: sequence of cities.
+      
+      length: length of the route, from the depot back to the depot.
+      
+      dirty: True if length is not up to date.
+    '''
+    __slots__ = ('length', 'dirty')
+    
+    def __init__(self, cities=(), length=0.0, dirty=True):
+        super().__init__(cities)
+        self.length = length
+        self.dirty = dirty
+
+def _copy_route_vr(route):
+    '''Copy of a route, keeping the cached length of Route objects.'''
+    if isinstance(route, Route):
+        return Route(route, route.length, route.dirty)
+    
+    return list(route)
+
+def _mark_dirty_vr(route):
+    '''Marks a route changed in place, so its length is measured again by the next evaluation.'''
+    if isinstance(route, Route):
+        route.dirty = True
+
+def _shift_length_vr(route, delta):
+    '''Updates the cached length of a route changed in place by a move of known delta.'''
+    if isinstance(route, Route) and not route.dirty:
+        route.length += delta
+
+def _route_length_vr(route, cities, distances=None):
+    '''Length of one route, from the depot back to the depot, from the distance matrix or from the coordinates.'''
+    if not route:
+        return 0.0
+    
+    if distances is not None:
+        return route_length_vr(route, distances)
+    
+    x0, y0 = cities[0][0], cities[0][1]
+    length = mt.sqrt((x0 - cities[route[0]][0])**2 + (y0 - cities[route[0]][1])**2)
+    length += mt.sqrt((cities[route[-1]][0] - x0)**2 + (cities[route[-1]][1] - y0)**2)
+    
+    for i in range(len(route) - 1):
+        x1, y1 = cities[route[i]][0], cities[route[i]][1]
+        x2, y2 = cities[route[i+1]][0], cities[route[i+1]][1]
+        length += mt.sqrt((x1 - x2)**2 + (y1 - y2)**2)
         
-def individual_fitness_vr(individual, cities):
-    '''Calculates the total distance in the path followed by a solution, including all routes. 
+    return length
+
+def _tracked_fitness_vr(individual, cities, distances=None, track=False):
+    '''Sum of the route lengths of a solution, where clean Route objects give their cached length and only the other 
+    routes are measured. With track, plain routes are replaced by Route objects holding their length.'''
+    fitness = 0.0
+    
+    for k, route in enumerate(individual):
+        if isinstance(route, Route):
+            if route.dirty:
+                route.length = _route_length_vr(route, cities, distances)
+                route.dirty = False
+            fitness += route.length
+        else:
+            length = _route_length_vr(route, cities, distances)
+            if track:
+                individual[k] = Route(route, length, False)
+            fitness += length
+            
+    return fitness
+
+def track_routes_vr(individual):
+    '''Turns the routes of a solution into Route objects, so their lengths are cached by the evaluation. 
+    
+    Args:
+      individual: list of routes, changed in place.
+      
+    Returns:
+      individual: list of Route objects.
+    '''
+    for k, route in enumerate(individual):
+        if not isinstance(route, Route):
+            individual[k] = Route(route)
+            
+    return individual
+
+def individual_fitness_vr(individual, cities, distances=None, track=False):
+    '''Calculates the total distance in the path followed by a solution, including all routes. When the routes are 
+    Route objects, or with track, the fitness is the sum of the cached route lengths, and only the routes marked 
+    dirty by the operators are measured again.
     
     Args:
       individual: sequence of routes.
       
       cities: list of city coordinates.
+      
+      distances: optional matrix from distance_matrix_vr. When given, the edges are looked up instead of computed.
+      
+      track: if True, plain routes are replaced by Route objects holding their length, so the next evaluations only 
+      measure the routes changed in between.
             
     Returns:
       fitness: integer.
     '''
+    if track or any(isinstance(route, Route) for route in individual):
+        return _tracked_fitness_vr(individual, cities, distances, track)
+    
+    if distances is not None:
+        tour = [0]
+        for route in individual:
+            tour += route
+            tour.append(0)
+        tour = np.asarray(tour)
+        return float(distances[tour[:-1], tour[1:]].sum())
+    
     x0, y0 = cities[0][0], cities[0][1]
     fitness = 0
     for route in individual:
@@ -99,30 +352,89 @@ def individual_fitness_vr(individual, cities):
     
     return fitness 
         
-def population_fitness_vr(population, cities):
-    '''Calculates the fitness for a population.
+def individual_key_vr(individual):
+    '''Hashable representation of an individual, used as key of a FitnessCache.
     
     Args:
-      population: list of individuals.
+      individual: sequence of routes.
+      
+    Returns:
+      key: tuple with one tuple of cities per route.
+    '''
+    return tuple(tuple(route) for route in individual)
+        
+def population_fitness_vr(population, cities, distances=None, cache=None, track=False):
+    '''Calculates the fitness for a population. Flattened populations, as created by flatten_population_vr or 
+    population_vr(..., array=True), are evaluated in a single batched computation.
+    
+    Args:
+      population: list of individuals, or tuple (tours, offsets) of arrays.
       
       cities: list of city coordinates.
-            
+      
+      distances: optional matrix from distance_matrix_vr, built once and reused every generation.
+      
+      cache: optional, only for list populations, FitnessCache from ga_cache. Individuals already in it are not evaluated again.
+      
+      track: only for list populations, see individual_fitness_vr. Flattened populations always measure every route, 
+      in one batched computation.
+      
     Returns:
-      population_fitness: integer.
+      population_fitness: list of fitness values, or array of them for flattened populations.
     '''
+    if isinstance(population, tuple):
+        if distances is None:
+            distances = distance_matrix_vr(cities)
+        tours, offsets = population
+        return _array_route_lengths_vr(tours, offsets, distances).sum(axis=1)
+    
     population_fitness = []
     
     for individual in population: 
-        fitness = individual_fitness_vr(individual, cities)
+        if cache is None:
+            fitness = individual_fitness_vr(individual, cities, distances, track)
+        else:
+            key = individual_key_vr(individual)
+            fitness = cache.get(key)
+            if fitness is None:
+                fitness = individual_fitness_vr(individual, cities, distances, track)
+                cache.put(key, fitness)
         population_fitness.append(fitness)
         
     return population_fitness
 
+def _array_route_lengths_vr(tours, offsets, distances):
+    '''Length of every route of a flattened population, as an array of shape (population_size, number_vehicles). 
+    Each city is charged the leg arriving at it, from the depot when it starts a route, and the last city of a route is 
+    also charged the leg back to the depot. The routes are then reduced as differences of the cumulative sum at the 
+    offsets, so empty routes simply have length 0.
+    '''
+    population_size, tour_size = tours.shape
+    rows = np.arange(population_size)[:, np.newaxis]
+    
+    # One extra column absorbs the markers of empty routes at the end of the tour
+    starts = np.zeros((population_size, tour_size + 1), dtype=bool)
+    starts[rows, offsets[:, : -1]] = True
+    ends = np.zeros((population_size, tour_size + 1), dtype=bool)
+    ends[rows, offsets[:, 1 :] - 1] = True
+    
+    previous = np.zeros_like(tours)
+    previous[:, 1 :] = tours[:, : -1]
+    previous[starts[:, : -1]] = 0
+    
+    legs = distances[previous, tours] + distances[tours, 0] * ends[:, : -1]
+    cumulative = np.zeros((population_size, tour_size + 1), dtype=legs.dtype)
+    np.cumsum(legs, axis=1, out=cumulative[:, 1 :])
+    
+    lengths = np.take_along_axis(cumulative, offsets[:, 1 :], axis=1) 
+    lengths -= np.take_along_axis(cumulative, offsets[:, : -1], axis=1)
+    return lengths
+
 ##################################################################################    
 ############################### MUTATION OPERATORS ###############################
 ##################################################################################
         
-def switch_mutation_vr(individual, individual_mutation_rate=0.05, route_mutation_rate=0.25):
+def switch_mutation_vr(individual, individual_mutation_rate=0.05, route_mutation_rate=0.25, rng=None):
     '''Exchanges the position of two cities in one ore more routes, with a certain mutation rate.
     
     Args:
@@ -132,42 +444,201 @@ def switch_mutation_vr(individual, individual_mutation_rate=0.05, route_mutation
       
       route_mutation_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       individual: list representing a solution.
     '''
+    rng = get_rng(rng)
     routes = len(individual)
-    value = rd.random()
+    value = rng.random()
     
     if value < individual_mutation_rate: 
         for route in individual:
-            value = rd.random()
+            value = rng.random()
             if value < route_mutation_rate:
                 route_size = len(route)
-                index1, index2 = rd.randint(0, route_size - 1), rd.randint(0, route_size - 1)
+                index1, index2 = rng.integers(0, route_size, size=2).tolist()
                 route[index1], route[index2] = route[index2], route[index1]
+                _mark_dirty_vr(route)
 
     return individual
 
-def population_switch_mutation_vr(population, individual_mutation_rate=0.05, route_mutation_rate=0.25):
-    '''Applies the gene switch mutation to a whole population:
+def _switch_decisions_vr(population, individual_mutation_rate, route_mutation_rate, rng):
+    '''Draws, for the whole population at once, which routes of which individuals get a switch mutation, and the two 
+    positions to switch as fractions of the route size.
+    '''
+    population_size = len(population)
+    number_routes = len(population[0]) if population_size else 0
+    
+    mutated = np.flatnonzero(rng.random(population_size) < individual_mutation_rate)
+    rows, routes = np.nonzero(rng.random((len(mutated), number_routes)) < route_mutation_rate)
+    fractions = rng.random((len(rows), 2))
+    return mutated[rows], routes, fractions
+
+def population_switch_mutation_vr(population, individual_mutation_rate=0.05, route_mutation_rate=0.25, rng=None):
+    '''Applies the gene switch mutation to a whole population. The individuals and routes to mutate, and the positions 
+    to switch, are drawn for the whole population at once, and only the chosen routes are touched.
     
     Args:
-      population: list of individuals.
+      population: list of individuals, or tuple (tours, offsets) of arrays, which is mutated in place.
       
       individual_mutation_rate: value between 0 and 1.
       
       route_mutation_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
-      population: list of individuals.
+      population: list of individuals, or tuple (tours, offsets) of arrays.
     
     '''    
-    for individual in population:
-        mutated_individual = switch_mutation_vr(individual, individual_mutation_rate, route_mutation_rate)    
+    rng = get_rng(rng)
+    
+    if isinstance(population, tuple):
+        tours, offsets = population
+        individuals, routes, fractions = _switch_decisions_vr(offsets[:, 1 :], individual_mutation_rate, 
+                                                              route_mutation_rate, rng)
+        starts = offsets[individuals, routes]
+        sizes = offsets[individuals, routes + 1] - starts
+        index1 = starts + (fractions[:, 0] * sizes).astype(starts.dtype)
+        index2 = starts + (fractions[:, 1] * sizes).astype(starts.dtype)
+        
+        # Empty routes have nothing to switch
+        individuals, index1, index2 = individuals[sizes > 0], index1[sizes > 0], index2[sizes > 0]
+        genes1 = tours[individuals, index1]
+        tours[individuals, index1] = tours[individuals, index2]
+        tours[individuals, index2] = genes1
+        return population
+    
+    individuals, routes, fractions = _switch_decisions_vr(population, individual_mutation_rate, route_mutation_rate, 
+                                                          rng)
+    
+    for i, k, (fraction1, fraction2) in zip(individuals.tolist(), routes.tolist(), fractions.tolist()):
+        route = population[i][k]
+        index1, index2 = int(fraction1 * len(route)), int(fraction2 * len(route))
+        if route:
+            route[index1], route[index2] = route[index2], route[index1]
+            _mark_dirty_vr(route)
     
     return population
 
-def partition_mutation_vr(individual, mutation_rate=0.05):
+def switch_delta_vr(route, index1, index2, distances):
+    '''Computes the change in length of a route caused by exchanging two of its cities, without applying it. Only the 
+    edges around both positions are looked at, so the cost does not depend on the size of the route.
+    
+    Args:
+      route: sequence of cities visited by one vehicle.
+      
+      index1, index2: positions that would be exchanged.
+      
+      distances: matrix from distance_matrix_vr.
+      
+    Returns:
+      delta: route length after the exchange minus route length before it.
+    '''
+    if index1 == index2:
+        return 0.0
+    
+    route_size = len(route)
+    swapped = {index1: route[index2], index2: route[index1]}
+    delta = 0.0
+    
+    # Edge k joins positions k and k + 1, with the depot on both ends of the route
+    for k in {index1 - 1, index1, index2 - 1, index2}:
+        city1 = route[k] if k >= 0 else 0
+        city2 = route[k + 1] if k + 1 < route_size else 0
+        new_city1 = swapped.get(k, city1)
+        new_city2 = swapped.get(k + 1, city2)
+        delta += distances[new_city1, new_city2] - distances[city1, city2]
+        
+    return float(delta)
+
+def switch_mutation_delta_vr(individual, distances, individual_mutation_rate=0.05, route_mutation_rate=0.25,
+                             rng=None):
+    '''Same as switch_mutation_vr, but also returns the fitness change of the moves, computed by switch_delta_vr.
+    
+    Args:
+      individual: list representing a solution.
+      
+      distances: matrix from distance_matrix_vr.
+      
+      individual_mutation_rate: value between 0 and 1.
+      
+      route_mutation_rate: value between 0 and 1.
+      
+      rng: random generator, see ga_random.get_rng.
+      
+    Returns:
+      individual: list representing a solution.
+      
+      delta: fitness change, 0 when the individual was not mutated.
+    '''
+    rng = get_rng(rng)
+    value = rng.random()
+    delta = 0.0
+    
+    if value < individual_mutation_rate: 
+        for route in individual:
+            value = rng.random()
+            if value < route_mutation_rate:
+                route_size = len(route)
+                index1, index2 = rng.integers(0, route_size, size=2).tolist()
+                route_delta = switch_delta_vr(route, index1, index2, distances)
+                route[index1], route[index2] = route[index2], route[index1]
+                _shift_length_vr(route, route_delta)
+                delta += route_delta
+
+    return individual, delta
+
+def population_switch_mutation_delta_vr(population, fitness, distances, individual_mutation_rate=0.05, 
+                                        route_mutation_rate=0.25, rng=None):
+    '''Applies the gene switch mutation to a whole population whose fitness is already known, updating the fitness 
+    values with the deltas of the moves instead of evaluating the mutants again. Mutated individuals and routes are 
+    copies.
+    
+    Args:
+      population: list of individuals.
+      
+      fitness: fitness values of the population, before the mutation.
+      
+      distances: matrix from distance_matrix_vr.
+      
+      individual_mutation_rate: value between 0 and 1.
+      
+      route_mutation_rate: value between 0 and 1.
+      
+      rng: random generator, see ga_random.get_rng.
+      
+    Returns:
+      population: list of individuals.
+      
+      population_fitness: fitness values of the mutated population.
+    '''
+    rng = get_rng(rng)
+    population_fitness = list(fitness)
+    individuals, routes, fractions = _switch_decisions_vr(population, individual_mutation_rate, route_mutation_rate, 
+                                                          rng)
+    
+    copied = set()
+    
+    for i, k, (fraction1, fraction2) in zip(individuals.tolist(), routes.tolist(), fractions.tolist()):
+        route = population[i][k]
+        index1, index2 = int(fraction1 * len(route)), int(fraction2 * len(route))
+        if route:
+            # Copied, since selection may share it with other positions, see ga_crossover
+            if i not in copied:
+                population[i] = list(population[i])
+                copied.add(i)
+            route = population[i][k] = _copy_route_vr(route)
+            route_delta = switch_delta_vr(route, index1, index2, distances)
+            route[index1], route[index2] = route[index2], route[index1]
+            _shift_length_vr(route, route_delta)
+            population_fitness[i] += route_delta
+            
+    return population, population_fitness
+
+def partition_mutation_vr(individual, mutation_rate=0.05, rng=None):
     '''Partitionates the solution in a different way. 
     
     Args:
@@ -175,10 +646,13 @@ def partition_mutation_vr(individual, mutation_rate=0.05):
       
       mutation_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       new_individual: list representing a solution.
     '''
-    value = rd.random()
+    rng = get_rng(rng)
+    value = rng.random()
     if value < mutation_rate:
         number_vehicles = len(individual)
         total_individual = []
@@ -188,7 +662,7 @@ def partition_mutation_vr(individual, mutation_rate=0.05):
             
         number_cities = len(total_individual)
         new_individual = []
-        partitions = rd.sample([_ for _ in range(1, number_cities - 2)], number_vehicles - 1)
+        partitions = (rng.permutation(number_cities - 3)[: number_vehicles - 1] + 1).tolist()
         partitions.sort()
 
         for i in range(len(partitions)):
@@ -203,147 +677,493 @@ def partition_mutation_vr(individual, mutation_rate=0.05):
         new_individual.append(route)
 
         return new_individual
+    
+    return individual
             
-def population_partition_mutation_vr(population, mutation_rate=0.05):
-    '''Applies the partition mutation to a whole population:
+def population_partition_mutation_vr(population, mutation_rate=0.05, rng=None):
+    '''Applies the partition mutation to a whole population. The individuals to mutate and their new partitions are 
+    drawn for the whole population at once, and the mutated individuals replace the old ones in the population.
     
     Args:
-      population: list of individuals.
+      population: list of individuals, or tuple (tours, offsets) of arrays, which is mutated in place.
       
       mutation_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
-      population: list of individuals.
+      population: list of individuals, or tuple (tours, offsets) of arrays.
     
     '''    
-    for individual in population:
-        mutated_individual = partition_mutation_vr(individual, mutation_rate)    
+    rng = get_rng(rng)
+    
+    if isinstance(population, tuple):
+        tours, offsets = population
+        population_size, number_cities = tours.shape
+    else:
+        population_size = len(population)
+        if population_size == 0:
+            return population
+        offsets = None
+        number_cities = sum(len(route) for route in population[0])
+    
+    number_vehicles = offsets.shape[1] - 1 if offsets is not None else len(population[0])
+    mutated = np.flatnonzero(rng.random(population_size) < mutation_rate)
+    
+    # Same partition points as partition_mutation_vr, from 1 to number_cities - 3
+    keys = rng.random((len(mutated), number_cities - 3))
+    partitions = np.sort(np.argsort(keys, axis=1)[:, : number_vehicles - 1] + 1, axis=1)
+    
+    if offsets is not None:
+        offsets[mutated, 1 : -1] = partitions
+        return population
+    
+    for i, partition in zip(mutated.tolist(), partitions.tolist()):
+        total_individual = [city for route in population[i] for city in route]
+        bounds = [0] + partition + [number_cities]
+        population[i] = [total_individual[bounds[k] : bounds[k + 1]] for k in range(number_vehicles)]
     
     return population
         
+##################################################################################    
+############################### INTER-ROUTE MOVES ################################
+##################################################################################
+
+INTER_ROUTE_MOVES = ('relocate', 'swap_star', 'two_opt_star')
+
+def route_length_vr(route, distances):
+    '''Length of one route, from the depot back to the depot.
+      
+    Args:
+      route: sequence of cities visited by one vehicle.
+      
+      distances: matrix from distance_matrix_vr.
+      
+    Returns:
+      length: float.
+    '''
+    tour = np.concatenate(([0], route, [0])).astype(np.int64)
+    return float(distances[tour[:-1], tour[1:]].sum())
+
+def route_lengths_vr(individual, distances):
+    '''Length of every route of a solution, the cache updated by the inter-route moves. Clean Route objects give their 
+    cached length.
+      
+    Args:
+      individual: sequence of routes.
+      
+      distances: matrix from distance_matrix_vr.
+      
+    Returns:
+      lengths: list of floats, one for each route.
+    '''
+    return [_cached_length_vr(route, distances) for route in individual]
+
+def _cached_length_vr(route, distances):
+    '''Length of one route, the cached one for clean Route objects.'''
+    if isinstance(route, Route) and not route.dirty:
+        return route.length
+    
+    return route_length_vr(route, distances)
+
+def _route_edges_vr(route):
+    '''Cities of a route, with the city before and after each one, the depot at both ends.'''
+    cities = np.asarray(route, dtype=np.int64)
+    previous = np.concatenate(([0], cities[:-1]))
+    following = np.concatenate((cities[1:], [0]))
+    return cities, previous, following
+
+def _insertion_costs_vr(cities, route, distances):
+    '''Extra length of inserting each city in each edge of a route, as an array of shape (len(cities), len(route) + 1).
+    Edge e joins route[e - 1] and route[e], with the depot at both ends.'''
+    starts = np.concatenate(([0], route)).astype(np.int64)
+    ends = np.concatenate((route, [0])).astype(np.int64)
+    column = cities[:, np.newaxis]
+    return distances[column, starts] + distances[column, ends] - distances[starts, ends]
+
+def _relocate_vr(route1, route2, distances):
+    '''Best move of one city of route1 into route2, as (delta, delta1, delta2, new_route1, new_route2), or None.'''
+    if len(route1) < 2:
+        return None
+    
+    cities, previous, following = _route_edges_vr(route1)
+    removal = distances[previous, cities] + distances[cities, following] - distances[previous, following]
+    insertion = _insertion_costs_vr(cities, route2, distances)
+    
+    delta = insertion - removal[:, np.newaxis]
+    index, edge = np.unravel_index(np.argmin(delta), delta.shape)
+    new_route1 = route1[: index] + route1[index + 1 :]
+    new_route2 = route2[: edge] + [route1[index]] + route2[edge :]
+    return float(delta[index, edge]), -float(removal[index]), float(insertion[index, edge]), new_route1, new_route2
+
+def _best_insertions_vr(cities, route, edges, distances, count=3):
+    '''Cost of inserting each of cities into route once the city at each position is taken out of it, as an array of
+    shape (len(route), len(cities)), with the edge used for each insertion, or -1 for the edge left by the city.
+    edges are the arrays given by _route_edges_vr for route. Only the count cheapest edges of
+    each city are kept, since taking one city out of the route removes at most two of them, and the edge created by
+    the removal is tried separately.
+    '''
+    insertion = _insertion_costs_vr(cities, route, distances)
+    count = min(count, insertion.shape[1])
+    best = np.argsort(insertion, axis=1, kind='stable')[:, : count]
+    best_costs = np.take_along_axis(insertion, best, axis=1)
+    
+    # Edges position and position + 1 touch the city at position, so they disappear with it
+    position = np.arange(len(route))[:, np.newaxis, np.newaxis]
+    valid = (best[np.newaxis] != position) & (best[np.newaxis] != position + 1)
+    costs = np.where(valid, best_costs[np.newaxis], np.inf)
+    choice = np.argmin(costs, axis=2)
+    costs = np.take_along_axis(costs, choice[:, :, np.newaxis], axis=2)[:, :, 0]
+    positions = best[np.arange(len(cities))[np.newaxis], choice]
+    
+    # Edge created between the neighbours of the removed city
+    _, previous, following = edges
+    replace = (distances[previous[:, np.newaxis], cities] + distances[cities, following[:, np.newaxis]] 
+               - distances[previous, following][:, np.newaxis])
+    positions = np.where(replace < costs, -1, positions)
+    return np.minimum(replace, costs), positions
+
+def _insert_vr(route, index, city, edge):
+    '''Takes out the city at position index of route, and inserts city in edge, or in its place if edge is -1.'''
+    if edge < 0:
+        return route[: index] + [city] + route[index + 1 :]
+    
+    route = route[: edge] + [city] + route[edge :]
+    return route[: index + (edge <= index)] + route[index + 1 + (edge <= index) :]
+
+def _swap_star_vr(route1, route2, distances):
+    '''Best exchange of a city of route1 with a city of route2, each one going to its cheapest position in the other
+    route, as (delta, delta1, delta2, new_route1, new_route2), or None.'''
+    if not route1 or not route2:
+        return None
+    
+    edges1 = _route_edges_vr(route1)
+    edges2 = _route_edges_vr(route2)
+    removal1 = distances[edges1[1], edges1[0]] + distances[edges1[0], edges1[2]] - distances[edges1[1], edges1[2]]
+    removal2 = distances[edges2[1], edges2[0]] + distances[edges2[0], edges2[2]] - distances[edges2[1], edges2[2]]
+    
+    # insertion1[i, j] puts city j of route2 in route1 without city i, insertion2[j, i] the other way round
+    insertion1, positions1 = _best_insertions_vr(edges2[0], route1, edges1, distances)
+    insertion2, positions2 = _best_insertions_vr(edges1[0], route2, edges2, distances)
+    delta1 = insertion1 - removal1[:, np.newaxis]
+    delta2 = insertion2.T - removal2[np.newaxis, :]
+    
+    delta = delta1 + delta2
+    index1, index2 = np.unravel_index(np.argmin(delta), delta.shape)
+    new_route1 = _insert_vr(route1, index1, route2[index2], int(positions1[index1, index2]))
+    new_route2 = _insert_vr(route2, index2, route1[index1], int(positions2[index2, index1]))
+    return (float(delta[index1, index2]), float(delta1[index1, index2]), float(delta2[index1, index2]), new_route1, 
+            new_route2)
+
+def _two_opt_star_vr(route1, route2, length1, length2, distances):
+    '''Best exchange of the ends of route1 and route2, as (delta, delta1, delta2, new_route1, new_route2), or None.
+    Cutting route1 before position i and route2 before position j gives the routes route1[: i] + route2[j :] and
+    route2[: j] + route1[i :]. The lengths of the new routes come from the lengths of the start of each route and
+    the cached lengths of the whole routes.'''
+    size1, size2 = len(route1), len(route2)
+    cities1 = np.concatenate(([0], route1, [0])).astype(np.int64)
+    cities2 = np.concatenate(([0], route2, [0])).astype(np.int64)
+    legs1 = distances[cities1[: -1], cities1[1 :]]
+    legs2 = distances[cities2[: -1], cities2[1 :]]
+    
+    # Length up to the cut and after it, the cut edge excluded
+    starts1 = np.concatenate(([0.0], np.cumsum(legs1[: -1])))[:, np.newaxis]
+    starts2 = np.concatenate(([0.0], np.cumsum(legs2[: -1])))[np.newaxis, :]
+    ends1 = length1 - starts1 - legs1[:, np.newaxis]
+    ends2 = length2 - starts2 - legs2[np.newaxis, :]
+    
+    heads1, tails1 = cities1[: -1, np.newaxis], cities1[1 :, np.newaxis]
+    heads2, tails2 = cities2[np.newaxis, : -1], cities2[np.newaxis, 1 :]
+    delta1 = starts1 + distances[heads1, tails2] + ends2 - length1
+    delta2 = starts2 + distances[heads2, tails1] + ends1 - length2
+    delta = delta1 + delta2
+    
+    # Neither route may be left empty
+    cuts1 = np.arange(size1 + 1)[:, np.newaxis]
+    cuts2 = np.arange(size2 + 1)[np.newaxis, :]
+    delta = np.where((cuts1 + size2 - cuts2 > 0) & (cuts2 + size1 - cuts1 > 0), delta, np.inf)
+    
+    i, j = np.unravel_index(np.argmin(delta), delta.shape)
+    if not np.isfinite(delta[i, j]):
+        return None
+    
+    return (float(delta[i, j]), float(delta1[i, j]), float(delta2[i, j]), route1[: i] + route2[j :], 
+            route2[: j] + route1[i :])
+
+def inter_route_mutation_vr(individual, distances, moves=INTER_ROUTE_MOVES, mutation_rate=0.05, lengths=None, 
+                            rng=None):
+    '''Improves a solution by moving cities between two of its routes, with a certain mutation rate. Two random routes
+    are chosen, and the best move of the given kinds between them is applied, if it shortens the solution:
+      
+      relocate: one city goes to its cheapest position in the other route.
+      
+      swap_star: one city of each route goes to its cheapest position in the other route.
+      
+      two_opt_star: the ends of both routes are exchanged.
+      
+    Every candidate move is evaluated from the few edges it changes, so all the moves between the two routes are
+    compared without computing the fitness again. No route is left empty.
+      
+    Args:
+      individual: list representing a solution.
+      
+      distances: matrix from distance_matrix_vr.
+      
+      moves: kinds of moves tried, from INTER_ROUTE_MOVES.
+      
+      mutation_rate: value between 0 and 1.
+      
+      lengths: cached lengths of the routes, from route_lengths_vr, updated with the move. If not given, only the 
+      two chosen routes are measured, clean Route objects giving their cached length.
+      
+      rng: random generator, see ga_random.get_rng.
+      
+    Returns:
+      individual: list representing a solution.
+      
+      delta: fitness change, 0 when the individual was not changed.
+    '''
+    for move in moves:
+        if move not in INTER_ROUTE_MOVES:
+            raise ValueError(f'unknown inter-route move: {move}')
+    
+    rng = get_rng(rng)
+    value = rng.random()
+    number_vehicles = len(individual)
+    
+    if value >= mutation_rate or number_vehicles < 2:
+        return individual, 0.0
+    
+    k1, k2 = rng.choice(number_vehicles, size=2, replace=False).tolist()
+    route1, route2 = individual[k1], individual[k2]
+    if lengths is None:
+        length1, length2 = _cached_length_vr(route1, distances), _cached_length_vr(route2, distances)
+    else:
+        length1, length2 = lengths[k1], lengths[k2]
+    
+    candidates = []
+    if 'relocate' in moves:
+        candidates.append(_relocate_vr(route1, route2, distances))
+        relocation = _relocate_vr(route2, route1, distances)
+        if relocation is not None:
+            candidates.append((relocation[0], relocation[2], relocation[1], relocation[4], relocation[3]))
+    if 'swap_star' in moves:
+        candidates.append(_swap_star_vr(route1, route2, distances))
+    if 'two_opt_star' in moves:
+        candidates.append(_two_opt_star_vr(route1, route2, length1, length2, distances))
+    
+    candidates = [candidate for candidate in candidates if candidate is not None]
+    if not candidates:
+        return individual, 0.0
+    
+    delta, delta1, delta2, new_route1, new_route2 = min(candidates, key=lambda candidate: candidate[0])
+    if delta >= -1e-9:
+        return individual, 0.0
+    
+    length1 += delta1
+    length2 += delta2
+    if lengths is not None:
+        lengths[k1], lengths[k2] = length1, length2
+    
+    # Routes of a tracked solution stay Route objects, with the lengths known from the move
+    if isinstance(route1, Route) or isinstance(route2, Route):
+        new_route1, new_route2 = Route(new_route1, length1, False), Route(new_route2, length2, False)
+    individual[k1], individual[k2] = new_route1, new_route2
+    return individual, delta
+
+def population_inter_route_mutation_vr(population, fitness, distances, moves=INTER_ROUTE_MOVES, mutation_rate=0.05, 
+                                       rng=None):
+    '''Applies the inter-route moves to a whole population whose fitness is already known, updating the fitness values
+    with the deltas of the moves instead of evaluating the mutants again.
+      
+    Args:
+      population: list of individuals, or tuple (tours, offsets) of arrays, which is mutated in place.
+      
+      fitness: fitness values of the population, before the mutation.
+      
+      distances: matrix from distance_matrix_vr.
+      
+      moves: kinds of moves tried, from INTER_ROUTE_MOVES.
+      
+      mutation_rate: value between 0 and 1.
+      
+      rng: random generator, see ga_random.get_rng.
+      
+    Returns:
+      population: list of individuals, or tuple (tours, offsets) of arrays.
+      
+      population_fitness: fitness values of the mutated population, as a list, or an array for flattened populations.
+    '''
+    rng = get_rng(rng)
+    flattened = isinstance(population, tuple)
+    population_fitness = np.array(fitness, dtype=np.float64) if flattened else list(fitness)
+    population_size = len(population[0]) if flattened else len(population)
+    mutated = np.flatnonzero(rng.random(population_size) < mutation_rate)
+    
+    for i in mutated.tolist():
+        if flattened:
+            tour, offset = population[0][i].tolist(), population[1][i].tolist()
+            individual = [tour[offset[k] : offset[k + 1]] for k in range(len(offset) - 1)]
+        else:
+            # Copied, since selection may share it with other positions, see ga_crossover. The move replaces the 
+            # two routes, so they need no copy
+            individual = population[i] = list(population[i])
+    
+        individual, delta = inter_route_mutation_vr(individual, distances, moves, 1.0, rng=rng)
+        population_fitness[i] += delta
+    
+        if flattened and delta:
+            population[0][i] = [city for route in individual for city in route]
+            population[1][i, 1 :] = np.cumsum([len(route) for route in individual])
+    
+    return population, population_fitness
+        
 ##################################################################################    
 ############################### CROSSOVER OPERATORS ##############################
 ##################################################################################
 
-def ordered_crossover_vr(parent1, parent2, crossover_rate=0.5):
+def ordered_crossover_vr(parent1, parent2, crossover_rate=0.5, rng=None):
     '''Applies the ordered crossover to two parents. It selects a partition of both parents, and creates two more lists 
     with them. After, it appends the rest of the elements that are not in the new individual, following the order in which 
     they appear in the other parent. To adequate to this problem, we concatenate the routes of each individual first, 
-    apply the crossover, and then partition the new solutions in the same spots again.
+    apply the crossover, and then partition the new solutions in the same spots again. The cities already placed are 
+    tracked in a mask, so the crossover is linear in the number of cities. The children are new lists.
     
     Args:
       parent1, parent2: possible solutions.
       
       crossover_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
       individual1, individual2: possible solutions.
     '''
-    value = rd.random()
+    rng = get_rng(rng)
+    value = rng.random()
     if value < crossover_rate:
-        individual1, total_parent1, partitions1 = [], [], []
-        individual2, total_parent2, partitions2 = [], [], []
-        partition = 0
+        total_parent1, partitions1 = [], [0]
+        total_parent2, partitions2 = [], [0]
 
         for route in parent1:
             total_parent1 += route
-            partition += len(route)
-            partitions1.append(partition)
-
-        partition = 0
+            partitions1.append(len(total_parent1))
 
         for route in parent2:
             total_parent2 += route
-            partition += len(route)
-            partitions2.append(partition)
-
-        start_index = rd.randint(0, len(total_parent1) - 2)
-        end_index = rd.randint(start_index + 2, len(total_parent1))
-
-        total_individual1 = total_parent1[start_index : end_index]
-        total_individual2 = total_parent2[start_index : end_index]
-
-        for gene in total_parent2:
-            if gene not in total_individual1:
-                total_individual1.append(gene)
+            partitions2.append(len(total_parent2))
 
-        for gene in total_parent1:
-            if gene not in total_individual2:
-                total_individual2.append(gene)
+        start_index = int(rng.integers(0, len(total_parent1) - 1))
+        end_index = int(rng.integers(start_index + 2, len(total_parent1) + 1))
 
-        for i in range(len(partitions1)):
-            route = total_individual1[0 : partitions1[0]]
-            if route not in individual1:
-                individual1.append(route)
-            else:
-                route = total_individual1[partitions1[i - 1] : partitions1[i]]
-                individual1.append(route)
+        total_individual1 = ordered_fill(total_parent1[start_index : end_index], total_parent2)
+        total_individual2 = ordered_fill(total_parent2[start_index : end_index], total_parent1)
 
-        for i in range(len(partitions2)):
-            route = total_individual2[0 : partitions2[0]]
-            if route not in individual2:
-                individual2.append(route)
-            else:
-                route = total_individual2[partitions2[i - 1] : partitions2[i]]
-                individual2.append(route)
+        individual1 = [total_individual1[partitions1[i] : partitions1[i + 1]] for i in range(len(parent1))]
+        individual2 = [total_individual2[partitions2[i] : partitions2[i + 1]] for i in range(len(parent2))]
 
         return individual1, individual2
     
     else:
-        return parent1, parent2
+        return [_copy_route_vr(route) for route in parent1], [_copy_route_vr(route) for route in parent2]
 
-def population_ordered_crossover_vr(population, crossover_rate=0.5):
-    '''Applies the ordered crossover to a whole population:
+def population_ordered_crossover_vr(population, crossover_rate=0.5, rng=None):
+    '''Applies the ordered crossover to a whole population. Flattened populations are crossed in one batched call, and 
+    each child keeps the route offsets of the parent its partition came from.
     
     Args:
-      population: list of individuals.
+      population: list of individuals, or tuple (tours, offsets) of arrays.
             
       crossover_rate: value between 0 and 1.
       
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
-      population: list of individuals.
+      population: list of individuals, or tuple (tours, offsets) of arrays.
     '''  
+    rng = get_rng(rng)
+    
+    if isinstance(population, tuple):
+        tours, offsets = population
+        population_size, size = tours.shape
+        pairs = population_size // 2
+        parents1, parents2 = tours[0 : 2 * pairs : 2], tours[1 : 2 * pairs : 2]
+        
+        new_tours = tours.copy()
+        crossed = np.flatnonzero(rng.random(pairs) < crossover_rate)
+        start_index = rng.integers(0, size - 1, size=len(crossed))
+        end_index = rng.integers(start_index + 2, size + 1)
+        new_tours[2 * crossed] = array_ordered_crossover(parents1[crossed], parents2[crossed], start_index, end_index)
+        new_tours[2 * crossed + 1] = array_ordered_crossover(parents2[crossed], parents1[crossed], 
+                                                             start_index, end_index)
+        order = rng.permutation(population_size)
+        return new_tours[order], offsets[order]
+    
     new_population = []
     
     if len(population) % 2 == 0:
         for parent1, parent2 in zip(population[ : : 2], population[1 : : 2]):
-            individual1, individual2 = ordered_crossover_vr(parent1, parent2, crossover_rate)
+            individual1, individual2 = ordered_crossover_vr(parent1, parent2, crossover_rate, rng)
             new_population.append(individual1)
             new_population.append(individual2)
-        rd.shuffle(new_population)
+        rng.shuffle(new_population)
         return new_population
     
     else: 
         for parent1, parent2 in zip(population[ : -1 : 2], population[1 : : 2]):
-            individual1, individual2 = ordered_crossover_vr(parent1, parent2, crossover_rate)
+            individual1, individual2 = ordered_crossover_vr(parent1, parent2, crossover_rate, rng)
             new_population.append(individual1)
             new_population.append(individual2)
             
-        new_population += [population[-1]]
-        rd.shuffle(new_population)
+        new_population += [[_copy_route_vr(route) for route in population[-1]]]
+        rng.shuffle(new_population)
         return new_population
 
 ##################################################################################    
 ############################### SELECTION OPERATORS ##############################
 ##################################################################################
     
-def roulette_selection_vr(population, fitness):
-    """Applies selection by roullete.
+def roulette_selection_vr(population, fitness, method='roulette', rng=None):
+    """Applies selection by roullete. The cumulative weights are computed once, and all the individuals are drawn with 
+    one vectorized search. The weights are the inverse fitness values, see ga_selection.selection_weights.
 
     Args:
-      population: list of individuals.
+      population: list of individuals, or tuple (tours, offsets) of arrays.
       
       fitness: list of fitness values from the individuals.
+      
+      method: 'roulette' for independent draws, or 'sus' for stochastic universal sampling, which uses a single random 
+      number for the whole selection.
             
+      rng: random generator, see ga_random.get_rng.
+      
     Returns:
-      new_population: list of individuals.
+      new_population: list of individuals, or tuple (tours, offsets) of arrays.
 
     """
-    inverse_fitness = [(1/i) for i in fitness]
-    new_population = rd.choices(population, inverse_fitness, k=len(population))
+    indices = selection_indices(fitness, minimize=True, method=method, rng=rng)
+    new_population = take_individuals(population, indices)
     return new_population
 
-def tournament_selection_vr(population, fitness, num_individuals=3):
+def tournament_indices_vr(fitness, num_individuals=3, size=None, rng=None):
+    """Runs all the tournaments of a selection at once, see ga_selection.tournament_indices. Lower fitness wins.
+
+    Args:
+      fitness: list or array of fitness values from the individuals.
+      
+      num_individuals: number of solutions that will participate in each tournament.
+      
+      size: number of tournaments. Defaults to the population size.
+      
+      rng: random generator, see ga_random.get_rng.
+            
+    Returns:
+      indices: integer array with the index of the winner of each tournament.
+
+    """
+    return tournament_indices(fitness, num_individuals, size, True, rng)
+
+def tournament_selection_vr(population, fitness, num_individuals=3, rng=None):
     """Applies selection by tournament.
 
     Args:
@@ -352,25 +1172,13 @@ def tournament_selection_vr(population, fitness, num_individuals=3):
       fitness: list of fitness values from the individuals.
       
       num_individuals: number of solutions that will participate in the tournament.
+      
+      rng: random generator, see ga_random.get_rng.
             
     Returns:
       new_population: list of individuals.
 
     """
-    new_population = []
-
-    for _ in range(len(population)):
-        tournament = rd.sample(population, num_individuals)
-
-        tournament_fitness = []
-        for individual in tournament:
-            index = population.index(individual)
-            tournament_fitness.append(fitness[index])
-
-        best_fitness = min(tournament_fitness)
-        index_best_fitness = tournament_fitness.index(best_fitness)
-        selected = tournament[index_best_fitness]
-
-        new_population.append(selected)
-
+    indices = tournament_indices_vr(fitness, num_individuals, rng=rng)
+    new_population = take_individuals(population, indices)
     return new_population
@@ -0,0 +1,32 @@
+import numpy as np
+
+import ga_compounds as cp
+
+def test_array_population_fitness_matches_lists():
+    population = cp.population_cp(50, 10, rng=0)
+    encoded = cp.encode_population_cp(population)
+
+    assert cp.decode_population_cp(encoded) == population
+    assert np.allclose(cp.population_fitness_cp(encoded), cp.population_fitness_cp(population))
+
+def test_array_mutations_match_list_path():
+    population = cp.population_cp(60, 10, rng=1)
+
+    for mutation, args in ((cp.population_element_mutation_cp, (0.5, 0.5)), (cp.population_weight_mutation_cp, (0.5,))):
+        mutated_list = mutation([[list(part) for part in individual] for individual in population], *args,
+                                rng=np.random.default_rng(2))
+        mutated_array = mutation(cp.encode_population_cp(population), *args, rng=np.random.default_rng(2))
+
+        decoded = cp.decode_population_cp(mutated_array)
+        assert [individual[0] for individual in decoded] == [individual[0] for individual in mutated_list]
+        assert np.allclose([individual[1] for individual in decoded], [individual[1] for individual in mutated_list])
+        assert np.allclose(cp.population_fitness_cp(mutated_array), cp.population_fitness_cp(mutated_list))
+
+def test_array_crossover_matches_list_path():
+    for population_size in (20, 21):
+        population = cp.population_cp(population_size, 10, rng=3)
+        crossed_list = cp.population_pair_crossover_cp(population, 0.5, np.random.default_rng(4))
+        crossed_array = cp.population_pair_crossover_cp(cp.encode_population_cp(population), 0.5,
+                                                        np.random.default_rng(4))
+
+        assert cp.decode_population_cp(crossed_array) == crossed_list
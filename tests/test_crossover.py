@@ -0,0 +1,45 @@
+import numpy as np
+
+import ga_keyword as kw
+import ga_travelling_salesman as ts
+import ga_vehicle_routing as vr
+from ga_crossover import array_ordered_crossover, ordered_fill
+
+def test_array_ordered_crossover_matches_ordered_fill():
+    rng = np.random.default_rng(0)
+    parents1 = np.array([rng.permutation(np.arange(1, 30)) for _ in range(12)])
+    parents2 = np.array([rng.permutation(np.arange(1, 30)) for _ in range(12)])
+    start_index = rng.integers(0, 28, size=12)
+    end_index = rng.integers(start_index + 2, 30)
+
+    children = array_ordered_crossover(parents1, parents2, start_index, end_index)
+    for child, parent1, parent2, start, end in zip(children.tolist(), parents1.tolist(), parents2.tolist(),
+                                                   start_index.tolist(), end_index.tolist()):
+        assert child == ordered_fill(parent1[start : end], parent2)
+        assert sorted(child) == list(range(1, 30))
+
+def _shares_lists(children, parents):
+    return any(child is parent for child in children for parent in parents)
+
+def test_children_never_share_lists_with_parents():
+    rng = np.random.default_rng(1)
+
+    for crossover_rate in (0.0, 1.0):
+        parents = ts.population_ts(2, 10, rng=rng)
+        assert not _shares_lists(ts.ordered_crossover_ts(*parents, crossover_rate, rng), parents)
+
+        parents = vr.population_vr(2, 10, 3, rng=rng)
+        children = vr.ordered_crossover_vr(*parents, crossover_rate, rng)
+        routes = [route for parent in parents for route in parent]
+        assert not _shares_lists(children, parents)
+        assert not _shares_lists([route for child in children for route in child], routes)
+
+        for parents in ([list('abc'), list('abcde')], [list('abc'), list('xyz')]):
+            assert not _shares_lists(kw.size_adaptative_crossover_kw(*parents, crossover_rate, rng), parents)
+
+def test_population_crossover_copies_the_unpaired_individual():
+    population = ts.population_ts(5, 10, rng=2)
+    new_population = ts.population_ordered_crossover_ts(population, 0.0, rng=3)
+
+    assert not _shares_lists(new_population, population)
+    assert sorted(map(tuple, new_population)) == sorted(map(tuple, population))
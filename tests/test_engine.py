@@ -0,0 +1,23 @@
+import numpy as np
+
+from ga_engine import HallOfFame
+
+def test_hall_of_fame_skips_copies_of_the_best_individual():
+    hall_of_fame = HallOfFame(3)
+    hall_of_fame.update([[1, 2]] * 3 + [[2, 1], [3, 3]], [1, 1, 1, 2, 3])
+
+    assert hall_of_fame.items() == [([1, 2], 1), ([2, 1], 2), ([3, 3], 3)]
+
+def test_hall_of_fame_keeps_the_best_distinct_individuals():
+    rng = np.random.default_rng(0)
+    hall_of_fame = HallOfFame(5, minimize=False)
+    seen = {}
+
+    for _ in range(10):
+        population = rng.integers(0, 4, size=(30, 2)).tolist()
+        fitness = [10 * a + b for a, b in population]
+        hall_of_fame.update(population, fitness)
+        seen.update((tuple(individual), value) for individual, value in zip(population, fitness))
+
+    assert hall_of_fame.fitness == sorted(seen.values(), reverse=True)[: 5]
+    assert len({tuple(individual) for individual in hall_of_fame.individuals}) == 5
@@ -0,0 +1,44 @@
+import numpy as np
+
+import ga_keyword as kw
+
+KEYWORD = list('GeneticAlgorithm2024')
+SIZE = [5, 30]
+
+def test_array_population_fitness_matches_lists():
+    population = kw.population_kw(50, SIZE, rng=0)
+    expected = kw.population_fitness_kw(population, KEYWORD)
+
+    for width in (None, 40):
+        encoded = kw.encode_population_kw(population, width)
+        assert kw.decode_population_kw(encoded) == population
+        assert np.array_equal(kw.population_fitness_kw(encoded, KEYWORD), expected)
+
+def test_size_mutation_matches_list_path():
+    population = kw.population_kw(100, [5, 10], rng=1)
+
+    # The encoded matrix is only as wide as the longest individual, narrower than the sizes the mutation can draw
+    encoded = kw.encode_population_kw(population)
+    mutated_array = kw.population_size_mutation_kw(encoded, SIZE, 0.9, np.random.default_rng(2))
+    mutated_list = kw.population_size_mutation_kw([list(individual) for individual in population], SIZE, 0.9,
+                                                  np.random.default_rng(2))
+
+    decoded = kw.decode_population_kw(mutated_array)
+    assert [len(individual) for individual in decoded] == [len(individual) for individual in mutated_list]
+    assert mutated_array[0].shape[1] == SIZE[-1]
+    assert np.array_equal(kw.population_fitness_kw(mutated_array, KEYWORD), kw.population_fitness_kw(decoded, KEYWORD))
+
+    for old, new in zip(population, decoded):
+        common = min(len(old), len(new))
+        assert new[: common] == old[: common]
+
+def test_gene_mutation_matches_list_path():
+    population = kw.population_kw(100, [0, 10], rng=3)
+    assert any(not individual for individual in population)
+
+    mutated_list = kw.population_gene_mutation_kw([list(individual) for individual in population], 0.5,
+                                                  np.random.default_rng(4))
+    mutated_array = kw.population_gene_mutation_kw(kw.encode_population_kw(population), 0.5, np.random.default_rng(4))
+
+    assert kw.decode_population_kw(mutated_array) == mutated_list
+    assert mutated_list != population
@@ -0,0 +1,42 @@
+import numpy as np
+
+from ga_local_search import TourLocalSearch
+from ga_spatial import distance_matrix, neighbour_lists
+
+def _tour_length(tour, distances):
+    return float(distances[tour, np.roll(tour, -1)].sum())
+
+def _search(number_cities, seed, **kwargs):
+    cities = np.random.default_rng(seed).integers(0, 1000, size=(number_cities, 2))
+    distances = distance_matrix(cities)
+    return TourLocalSearch(distances, neighbour_lists(cities, 8), **kwargs), distances
+
+def test_improve_returns_a_shorter_permutation():
+    for number_cities, or_opt_length in ((4, 3), (12, 0), (60, 3), (200, 2)):
+        search, distances = _search(number_cities, number_cities, or_opt_length=or_opt_length)
+        tour = np.random.default_rng(1).permutation(number_cities).tolist()
+
+        improved, gain = search.improve(tour)
+        assert sorted(improved) == list(range(number_cities))
+        assert gain >= 0
+        assert np.isclose(gain, _tour_length(tour, distances) - _tour_length(improved, distances))
+
+def test_improve_keeps_the_blocks_of_split():
+    search, distances = _search(80, 2)
+    rng = np.random.default_rng(3)
+
+    for split in (1, 20, 40, 78):
+        tour = [0] + (rng.permutation(79) + 1).tolist()
+        improved, gain = search.improve(tour, split)
+
+        assert improved[0] == 0
+        assert set(improved[1 : split + 1]) == set(tour[1 : split + 1])
+        assert np.isclose(gain, _tour_length(tour, distances) - _tour_length(improved, distances))
+
+def test_budget_limits_the_moves():
+    search, distances = _search(100, 4, max_moves=3)
+    tour = np.random.default_rng(5).permutation(100).tolist()
+    unlimited, _ = _search(100, 4)
+
+    _, gain = search.improve(tour)
+    assert 0 < gain < unlimited.improve(tour)[1]
@@ -0,0 +1,23 @@
+import numpy as np
+
+from ga_seeding import SEEDING_STRATEGIES, TourBuilder
+
+COORDINATES = np.random.default_rng(0).integers(0, 1000, size=(120, 2))
+
+def test_tours_are_permutations_of_the_cities():
+    duplicates = np.random.default_rng(1).integers(0, 4, size=(40, 2))
+
+    for coordinates, cities in ((COORDINATES, None), (COORDINATES, list(range(1, 120, 2))), (duplicates, None)):
+        builder = TourBuilder(coordinates, cities)
+        expected = sorted(range(len(coordinates)) if cities is None else cities)
+
+        for strategy in SEEDING_STRATEGIES:
+            assert sorted(builder.build(strategy)) == expected
+            assert sorted(builder.build(strategy, np.random.default_rng(2))) == expected
+
+def test_tours_are_reproducible():
+    builder = TourBuilder(COORDINATES)
+
+    for strategy in SEEDING_STRATEGIES:
+        assert builder.build(strategy) == builder.build(strategy)
+        assert builder.build(strategy, np.random.default_rng(3)) == builder.build(strategy, np.random.default_rng(3))
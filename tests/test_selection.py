@@ -0,0 +1,15 @@
+import numpy as np
+
+from ga_selection import tournament_indices
+
+def test_tournament_indices_pick_the_best_participant():
+    fitness = np.array([5.0, 1.0, 3.0, 4.0, 2.0])
+    participants = np.random.default_rng(0).integers(0, fitness.size, size=(200, 3))
+
+    for minimize, choose in ((True, np.argmin), (False, np.argmax)):
+        expected = participants[np.arange(200), choose(fitness[participants], axis=1)]
+        indices = tournament_indices(fitness, 3, 200, minimize, np.random.default_rng(0))
+        assert np.array_equal(indices, expected)
+
+def test_tournament_size_defaults_to_population_size():
+    assert tournament_indices([3.0, 1.0, 2.0], rng=0).shape == (3,)
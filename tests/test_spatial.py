@@ -0,0 +1,49 @@
+import numpy as np
+
+from ga_spatial import SpatialGrid, distance_matrix, neighbour_lists
+
+def test_distance_matrix_matches_pairwise_distances():
+    cities = np.random.default_rng(0).integers(0, 1000, size=(57, 2))
+    expected = np.sqrt(((cities[:, np.newaxis, :] - cities[np.newaxis, :, :])**2).sum(axis=-1))
+
+    for block_size in (None, 1, 10, 57, 100):
+        assert np.allclose(distance_matrix(cities, block_size=block_size), expected)
+
+def test_distance_matrix_dtype():
+    cities = np.random.default_rng(1).integers(0, 1000, size=(20, 2))
+    distances = distance_matrix(cities, np.float32, block_size=3)
+
+    assert distances.dtype == np.float32
+    assert np.allclose(distances, distance_matrix(cities), rtol=1e-6)
+
+def _brute_force_distances(cities, point, k, exclude=None):
+    distances = np.hypot(*(np.asarray(cities, dtype=np.float64) - point).T)
+    if exclude is not None:
+        distances[exclude] = np.inf
+    return np.sort(distances)[: k]
+
+def test_neighbour_lists_match_brute_force():
+    rng = np.random.default_rng(2)
+    line = [(x, 0) for x in rng.permutation(60).tolist()]
+    duplicates = rng.integers(0, 5, size=(60, 2)).tolist()
+
+    for cities in (rng.integers(0, 1000, size=(200, 2)).tolist(), line, duplicates):
+        neighbours = neighbour_lists(cities, 8)
+        assert neighbours.shape == (len(cities), 8)
+
+        for city, row in enumerate(neighbours):
+            assert city not in row and len(set(row.tolist())) == 8
+            distances = np.hypot(*(np.asarray(cities)[row] - cities[city]).T)
+            assert np.allclose(distances, _brute_force_distances(cities, cities[city], 8, city))
+
+def test_grid_query_matches_brute_force():
+    rng = np.random.default_rng(3)
+    cities = rng.integers(0, 100, size=(150, 2))
+    grid = SpatialGrid(cities)
+
+    for point in rng.uniform(-20, 120, size=(30, 2)):
+        indices = grid.query(point, 5)
+        assert np.allclose(np.hypot(*(cities[indices] - point).T), _brute_force_distances(cities, point, 5))
+
+def test_neighbour_lists_of_few_cities():
+    assert neighbour_lists([(0, 0), (1, 1), (3, 0)], 10).tolist() == [[1, 2], [0, 2], [1, 0]]
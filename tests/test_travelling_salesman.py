@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+import ga_travelling_salesman as ts
+from ga_local_search import TourLocalSearch
+from ga_spatial import neighbour_lists
+
+CITIES = ts.cities_ts(40, 1000, rng=0)
+DISTANCES = ts.distance_matrix_ts(CITIES)
+NEIGHBOURS = neighbour_lists(CITIES, 5)
+
+def test_fitness_with_distance_matrix_matches_coordinates():
+    population = ts.population_ts(20, len(CITIES), rng=1)
+
+    for penalty in (0, 1, 100):
+        expected = [ts.individual_fitness_ts(individual, CITIES, penalty) for individual in population]
+        assert np.allclose(ts.population_fitness_ts(population, CITIES, penalty, DISTANCES), expected)
+
+def test_array_population_fitness_matches_lists():
+    population = ts.population_ts(30, len(CITIES), array=True, rng=2)
+    assert population.shape == (30, len(CITIES) - 1)
+
+    for penalty in (0, 1, 100):
+        expected = [ts.individual_fitness_ts(individual, CITIES, penalty) for individual in population.tolist()]
+        assert np.allclose(ts.population_fitness_ts(population, CITIES, penalty, DISTANCES), expected)
+
+def test_switch_delta_matches_recomputed_fitness():
+    individual = ts.individual_ts(len(CITIES), rng=3)
+
+    for index1, index2 in ((0, 5), (3, 4), (10, 10), (0, len(individual) - 1), (20, 2)):
+        for penalty in (0, 1, 100):
+            mutant = list(individual)
+            mutant[index1], mutant[index2] = mutant[index2], mutant[index1]
+            delta = ts.switch_delta_ts(individual, index1, index2, DISTANCES, penalty)
+            fitness = ts.individual_fitness_ts(individual, CITIES, penalty)
+            assert np.isclose(delta, ts.individual_fitness_ts(mutant, CITIES, penalty) - fitness)
+
+def test_delta_mutation_after_selection_matches_fitness():
+    rng = np.random.default_rng(4)
+
+    for array in (False, True):
+        population = ts.population_ts(40, len(CITIES), array, rng)
+        fitness = ts.population_fitness_ts(population, CITIES, 1, DISTANCES)
+        population = ts.roulette_selection_ts(population, fitness, rng=rng)
+        fitness = ts.population_fitness_ts(population, CITIES, 1, DISTANCES)
+
+        population, fitness = ts.population_switch_mutation_delta_ts(population, fitness, DISTANCES, 1, 0.8, rng)
+        assert isinstance(fitness, np.ndarray) == array
+        assert np.allclose(fitness, ts.population_fitness_ts(population, CITIES, 1, DISTANCES))
+
+def test_cities_are_distinct_and_limited_by_the_grid():
+    cities = ts.cities_ts(121, 10, rng=5)
+    assert len(set(cities)) == 121
+
+    with pytest.raises(ValueError):
+        ts.cities_ts(122, 10, rng=5)
+
+def test_neighbour_switch_mutation_keeps_permutations():
+    rng = np.random.default_rng(6)
+    individual = ts.individual_ts(len(CITIES), rng=rng)
+    positions = ts._positions_ts(individual)
+
+    for _ in range(50):
+        ts.neighbour_switch_mutation_ts(individual, NEIGHBOURS, 1.0, rng, positions)
+        assert sorted(individual) == list(range(1, len(CITIES)))
+        assert np.array_equal(positions, ts._positions_ts(individual))
+
+    for array in (False, True):
+        population = ts.population_ts(30, len(CITIES), array, rng)
+        population = ts.population_neighbour_switch_mutation_ts(population, NEIGHBOURS, 0.8, rng)
+        for individual in np.asarray(population).tolist():
+            assert sorted(individual) == list(range(1, len(CITIES)))
+
+def test_local_search_gain_matches_fitness_and_keeps_the_penalty():
+    for number_cities in (40, 41):
+        cities = ts.cities_ts(number_cities, 1000, rng=7)
+        distances = ts.distance_matrix_ts(cities)
+        search = TourLocalSearch(distances, neighbour_lists(cities, 8))
+        individual = ts.individual_ts(number_cities, rng=8)
+
+        for penalty in (0, 1, 100):
+            improved, gain = ts.local_search_ts(individual, search, penalty)
+            assert sorted(improved) == list(range(1, number_cities))
+            before = ts.individual_fitness_ts(individual, cities, penalty, distances)
+            assert np.isclose(gain, before - ts.individual_fitness_ts(improved, cities, penalty, distances))
+            if penalty:
+                half = number_cities // 2
+                assert set(improved[: half]) == set(individual[: half])
+
+def test_population_local_search_with_lists_and_arrays():
+    search = TourLocalSearch(DISTANCES, NEIGHBOURS)
+
+    for array in (False, True):
+        population = ts.population_ts(10, len(CITIES), array, rng=9)
+        before = ts.population_fitness_ts(population, CITIES, 1, DISTANCES)
+        population = ts.population_local_search_ts(np.copy(population) if array else population, search, 1)
+
+        assert isinstance(population, np.ndarray) == array
+        for individual in np.asarray(population).tolist():
+            assert sorted(individual) == list(range(1, len(CITIES)))
+        after = ts.population_fitness_ts(population, CITIES, 1, DISTANCES)
+        assert np.all(np.asarray(after) <= np.asarray(before) + 1e-9)
+
+def test_seeded_population_is_valid_and_reproducible():
+    for number_cities in (40, 41):
+        cities = ts.cities_ts(number_cities, 1000, rng=10)
+        population = ts.seeded_population_ts(12, cities, 0.5, rng=11)
+
+        assert len(population) == 12
+        for individual in population:
+            assert sorted(individual) == list(range(1, number_cities))
+        for individual in population[: 6]:
+            assert ts.individual_fitness_ts(individual, cities, 1) == ts.individual_fitness_ts(individual, cities, 0)
+        assert population == ts.seeded_population_ts(12, cities, 0.5, rng=11)
+        assert np.array_equal(ts.seeded_population_ts(12, cities, 0.5, array=True, rng=11), population)
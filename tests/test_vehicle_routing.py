@@ -0,0 +1,141 @@
+import copy
+import pickle
+
+import numpy as np
+
+import ga_vehicle_routing as vr
+
+CITIES = vr.cities_vr(40, 1000, rng=0)
+DISTANCES = vr.distance_matrix_vr(CITIES)
+
+def test_fitness_with_distance_matrix_matches_coordinates():
+    population = vr.population_vr(20, len(CITIES), 4, rng=1)
+    expected = [vr.individual_fitness_vr(individual, CITIES) for individual in population]
+
+    assert np.allclose(vr.population_fitness_vr(population, CITIES, DISTANCES), expected)
+
+def test_flattened_population_round_trip():
+    population = vr.population_vr(20, len(CITIES), 4, rng=2)
+    tours, offsets = vr.flatten_population_vr(population)
+
+    assert vr.unflatten_population_vr(tours, offsets) == population
+
+def test_flattened_population_fitness_matches_lists():
+    population = vr.population_vr(20, len(CITIES), 4, rng=3)
+    expected = vr.population_fitness_vr(population, CITIES, DISTANCES)
+
+    assert np.allclose(vr.population_fitness_vr(vr.flatten_population_vr(population), CITIES, DISTANCES), expected)
+
+def test_flattened_population_fitness_with_empty_routes():
+    population = [[[1, 2, 3], [], [4, 5]], [[], [5, 4, 3, 2, 1], []]]
+    cities = CITIES[: 6]
+    expected = vr.population_fitness_vr(population, cities, DISTANCES[: 6, : 6])
+
+    assert np.allclose(vr.population_fitness_vr(vr.flatten_population_vr(population), cities, DISTANCES[: 6, : 6]),
+                       expected)
+
+def test_switch_delta_matches_recomputed_length():
+    route = [3, 9, 12, 1, 30, 22]
+
+    for index1, index2 in ((0, 5), (1, 2), (4, 4), (5, 0), (2, 4)):
+        mutant = list(route)
+        mutant[index1], mutant[index2] = mutant[index2], mutant[index1]
+        expected = vr.individual_fitness_vr([mutant], CITIES) - vr.individual_fitness_vr([route], CITIES)
+        assert np.isclose(vr.switch_delta_vr(route, index1, index2, DISTANCES), expected)
+
+def test_delta_mutation_after_selection_matches_fitness():
+    rng = np.random.default_rng(4)
+    population = vr.population_vr(40, len(CITIES), 4, rng=rng)
+    fitness = vr.population_fitness_vr(population, CITIES, DISTANCES)
+    population = vr.roulette_selection_vr(population, fitness, rng=rng)
+    fitness = vr.population_fitness_vr(population, CITIES, DISTANCES)
+
+    population, fitness = vr.population_switch_mutation_delta_vr(population, fitness, DISTANCES, 0.8, 0.8, rng)
+    assert np.allclose(fitness, vr.population_fitness_vr(population, CITIES, DISTANCES))
+
+def test_inter_route_delta_matches_recomputed_fitness():
+    rng = np.random.default_rng(5)
+    population = vr.population_vr(30, len(CITIES), 4, rng=rng)
+
+    for moves in (('relocate',), ('swap_star',), ('two_opt_star',), vr.INTER_ROUTE_MOVES):
+        for individual in population:
+            before = vr.individual_fitness_vr(individual, CITIES)
+            lengths = vr.route_lengths_vr(individual, DISTANCES)
+            mutant, delta = vr.inter_route_mutation_vr(list(individual), DISTANCES, moves, 1.0, lengths, rng)
+            assert delta <= 0
+            assert np.isclose(vr.individual_fitness_vr(mutant, CITIES), before + delta)
+            assert np.allclose(lengths, [vr.route_length_vr(route, DISTANCES) for route in mutant])
+            assert sorted(city for route in mutant for city in route) == list(range(1, len(CITIES)))
+
+def test_swap_star_matches_brute_force():
+    rng = np.random.default_rng(6)
+
+    for _ in range(20):
+        cities = rng.permutation(np.arange(1, len(CITIES))).tolist()
+        route1, route2 = cities[: 6], cities[6 : 11]
+        best = np.inf
+        for index1, city1 in enumerate(route1):
+            for index2, city2 in enumerate(route2):
+                rest1, rest2 = route1[: index1] + route1[index1 + 1 :], route2[: index2] + route2[index2 + 1 :]
+                length1 = min(vr.route_length_vr(rest1[: e] + [city2] + rest1[e :], DISTANCES) for e in range(6))
+                length2 = min(vr.route_length_vr(rest2[: e] + [city1] + rest2[e :], DISTANCES) for e in range(5))
+                best = min(best, length1 + length2)
+        best -= vr.route_length_vr(route1, DISTANCES) + vr.route_length_vr(route2, DISTANCES)
+
+        delta, _, _, new_route1, new_route2 = vr._swap_star_vr(route1, route2, DISTANCES)
+        assert np.isclose(delta, best)
+        assert np.isclose(vr.route_length_vr(new_route1, DISTANCES) + vr.route_length_vr(new_route2, DISTANCES)
+                          - vr.route_length_vr(route1, DISTANCES) - vr.route_length_vr(route2, DISTANCES), delta)
+
+def test_inter_route_mutation_after_selection_matches_fitness():
+    for flattened in (False, True):
+        rng = np.random.default_rng(7)
+        population = vr.population_vr(40, len(CITIES), 4, rng=rng)
+        if flattened:
+            population = vr.flatten_population_vr(population)
+        fitness = vr.population_fitness_vr(population, CITIES, DISTANCES)
+        population = vr.roulette_selection_vr(population, fitness, rng=rng)
+        fitness = vr.population_fitness_vr(population, CITIES, DISTANCES)
+
+        population, fitness = vr.population_inter_route_mutation_vr(population, fitness, DISTANCES,
+                                                                     mutation_rate=0.8, rng=rng)
+        assert isinstance(fitness, np.ndarray) == flattened
+        assert np.allclose(fitness, vr.population_fitness_vr(population, CITIES, DISTANCES))
+
+def test_tracked_fitness_matches_recomputed_fitness():
+    rng = np.random.default_rng(8)
+    population = [vr.track_routes_vr(individual) for individual in vr.population_vr(40, len(CITIES), 4, rng=rng)]
+    fitness = vr.population_fitness_vr(population, CITIES, DISTANCES, track=True)
+
+    for _ in range(5):
+        population = vr.roulette_selection_vr(population, fitness, rng=rng)
+        population = vr.population_ordered_crossover_vr(population, 0.5, rng)
+        population = vr.population_switch_mutation_vr(population, 0.5, 0.5, rng)
+        population = vr.population_partition_mutation_vr(population, 0.2, rng)
+        fitness = vr.population_fitness_vr(population, CITIES, DISTANCES, track=True)
+        population, fitness = vr.population_switch_mutation_delta_vr(population, fitness, DISTANCES, 0.5, 0.5, rng)
+        population, fitness = vr.population_inter_route_mutation_vr(population, fitness, DISTANCES,
+                                                                     mutation_rate=0.5, rng=rng)
+
+        plain = [[list(route) for route in individual] for individual in population]
+        expected = vr.population_fitness_vr(plain, CITIES, DISTANCES)
+        assert np.allclose(fitness, expected)
+        assert np.allclose(vr.population_fitness_vr(population, CITIES, DISTANCES, track=True), expected)
+
+def test_route_copies_keep_the_cached_length():
+    route = vr.Route([4, 8, 15], 12.5, False)
+
+    for copied in (copy.deepcopy(route), pickle.loads(pickle.dumps(route))):
+        assert copied == route and copied is not route
+        assert (copied.length, copied.dirty) == (12.5, False)
+
+def test_seeded_population_is_valid_and_reproducible():
+    population = vr.seeded_population_vr(12, CITIES, 4, 0.5, rng=9)
+
+    assert len(population) == 12
+    for individual in population:
+        assert len(individual) == 4
+        assert sorted(city for route in individual for city in route) == list(range(1, len(CITIES)))
+    for individual in population[: 6]:
+        assert all(individual)
+    assert population == vr.seeded_population_vr(12, CITIES, 4, 0.5, rng=9)